@@ -4,17 +4,18 @@ import secrets
 from app.core.settings import settings
 from app.db.uow import UnitOfWork, get_uow
 from app.core.jwt import create_access_token
-from app.core.auth import CurrentUser
+from app.core.auth import CurrentClaims
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.get("/me")
-async def read_me(user: CurrentUser):
+async def read_me(user: CurrentClaims):
     """
     Returns information about the currently authenticated user.
+    Answered from the token's identity claims when they are fresh (see CurrentClaims).
 
     Args:
-        user (CurrentUser): The authenticated user injected by the dependency.
+        user (CurrentClaims): The authenticated user injected by the dependency.
 
     Returns:
         dict: Contains the user's ID, display name, and duck color.
@@ -52,5 +53,5 @@ async def login(
     user = await uow.users.ensure_for_login(uid, display)
     await uow.commit()
 
-    token = create_access_token({"sub": uid, "display": display})
+    token = create_access_token({"sub": uid, "display": display}, user=user)
     return {"access_token": token, "token_type": "bearer"}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.services.overlay import send_event, make_chat_event
+from app.services.overlay import send_event, chat_payload, overlay_stats
 
 router = APIRouter(prefix="/_dev/overlay", tags=["dev"])
 
@@ -20,5 +20,15 @@ async def testpush(display: str = "Viewer",
     Returns:
         dict: Indicates whether the message was sent.
     """
-    await send_event(channel, make_chat_event(display, message, user_id))
-    return {"sent": True}
\ No newline at end of file
+    await send_event(channel, chat_payload(display, message, user_id))
+    return {"sent": True}
+
+@router.get("/stats")
+async def stats():
+    """
+    Reports live overlay rooms, sockets and broker listeners for this worker.
+
+    Returns:
+        dict: Overlay counters (see overlay_stats); /metrics has them too, with the caches.
+    """
+    return overlay_stats()
\ No newline at end of file
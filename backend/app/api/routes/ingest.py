@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from app.core.auth import require_ingest_key
+from app.db.uow import UnitOfWork, get_uow
+from app.schemas.ingest import ChatBatch
+from app.services.chat import ingest_chat
+
+router = APIRouter(prefix="/ingest", tags=["ingest"], dependencies=[Depends(require_ingest_key)])
+
+@router.post("/chat")
+async def post_chat(body: ChatBatch, uow: UnitOfWork = Depends(get_uow)):
+    """
+    Relays a batch of chat messages from a chat bridge to an overlay room.
+
+    Args:
+        body (ChatBatch): Target room and messages, in chat order.
+        uow (UnitOfWork): Unit of Work instance for database operations.
+
+    Returns:
+        dict: Number of messages sent.
+    """
+    return {"sent": await ingest_chat(uow, body.channel, body.messages)}
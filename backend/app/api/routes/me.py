@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from app.core.auth import auth_context
+from app.core.auth import CurrentUser, claims_context
 from app.db.uow import UnitOfWork, get_uow
 from app.schemas.duck import DuckOut, DuckPatch
 from app.services.ducks import EDITABLE_FIELDS, apply_duck_patch
 from app.utils.patch import extract_patch
 
-router = APIRouter(prefix="/me", tags=["me"], dependencies=[Depends(auth_context)]) # Protege tout le router
+# Protege tout le router; reads are served from token claims when fresh, writes load the row (CurrentUser)
+router = APIRouter(prefix="/me", tags=["me"], dependencies=[Depends(claims_context)])
 
 @router.get("/duck")
 async def me_duck(request: Request):
@@ -29,7 +30,7 @@ async def me_duck(request: Request):
 
 
 @router.patch("/duck")
-async def patch_duck(request: Request, body: DuckPatch, channel: str = "default", uow: UnitOfWork = Depends(get_uow)):
+async def patch_duck(user: CurrentUser, body: DuckPatch, channel: str = "default", uow: UnitOfWork = Depends(get_uow)):
     """
     Partially updates the duck for the authenticated user.
     Editable fields are defined in EDITABLE_FIELDS (imported from app.services.ducks).
@@ -42,7 +43,7 @@ async def patch_duck(request: Request, body: DuckPatch, channel: str = "default"
     4. Notifies the overlay if the color has changed.
 
     Args:
-        request (Request): FastAPI request object containing the request context.
+        user (CurrentUser): The authenticated user, loaded from storage (not from token claims).
         body (DuckPatch): Pydantic model containing fields to patch.
         channel (str): Overlay channel name.
         uow (UnitOfWork): Unit of Work instance for database operations.
@@ -51,11 +52,8 @@ async def patch_duck(request: Request, body: DuckPatch, channel: str = "default"
         dict: Confirmation and final duck state (serialized via DuckOut).
 
     Raises:
-        HTTPException: If the user is not found (404) or if patch validation fails (400).
+        HTTPException: If patch validation fails (400).
     """
-    user = request.state.user
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
     # 1) Extract only the sent and allowed fields
     try:
         patch = extract_patch(body, allowed=EDITABLE_FIELDS)
@@ -64,6 +62,6 @@ async def patch_duck(request: Request, body: DuckPatch, channel: str = "default"
     if not patch:
         # No changes, return current duck color
         return {"ok": True, "duck": {"duck_color": user.duck_color}}
-    updated, _ = await apply_duck_patch(uow, user.id, patch, channel=channel)
+    updated, _ = await apply_duck_patch(uow, user.id, patch, channel=channel, user=user)
     # Unpack the updated dict into DuckOut for serialization
     return {"ok": True, "duck": DuckOut(**updated).model_dump()}
@@ -1,8 +1,9 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, Query
 from app.core.auth import auth_context
-from app.db.uow import UnitOfWork, get_uow
-from app.services.overlay import ensure_room_listener, rooms  # our singleton Rooms()
+from app.db.uow import UnitOfWork, UowFactory, get_uow_factory
+from app.services import wire
+from app.services.overlay import ensure_room_listener, heartbeat, release_room_listener, rooms  # our singleton Rooms()
 from app.core.jwt import decode_access_token
 
 
@@ -24,23 +25,32 @@ async def user_from_token(uow: UnitOfWork, token: Optional[str]):
 async def ws_overlay(ws: WebSocket,
                     channel: str = Query("default", description='Room; "default" = user room'),
                     token: Optional[str] = Query(None, description="JWT token for authentication"),
-                    uow: UnitOfWork = Depends(get_uow)):
-    # 1. Authenticate the user
-    user = await user_from_token(uow, token)
+                    encoding: Optional[str] = Query(None, description='Wire format: "json" (default), "compact" or "msgpack"'),
+                    compress: Optional[str] = Query(None, description='"deflate" for frames compressed once per room'),
+                    uow_factory: UowFactory = Depends(get_uow_factory)):
+    # 1. Authenticate the user; the session goes back to the pool before the socket loop
+    async with uow_factory() as uow:
+        user = await user_from_token(uow, token)
     if not user:
         await ws.close(code=4401, reason="Unauthorized")
         return
+    fmt, deflate, subprotocol = wire.negotiate(encoding, ws.scope.get("subprotocols", ()), compress)
+    if fmt is None:
+        await ws.close(code=4400, reason="Unsupported encoding")
+        return
     
     # 2. Determine the room name
     room = f"user:{user.id}" if channel == "default" else channel
 
-    # 3. Add the WebSocket to the room and manage the connection
-    await rooms.add(ws, room)
+    # 3. Subscribe before accepting, so everything published once the handshake completes gets through
     try:
-        await ensure_room_listener(room)  # no-op si pas de Redis
+        await ensure_room_listener(room)  # no-op sans broker
+        await rooms.add(ws, room, fmt, subprotocol, deflate)
         while True:
-            await ws.receive_text()  # keep-alive; on ignore les messages entrants
-    except WebSocketDisconnect:
-        pass
+            await ws.receive_text()  # pong / keep-alive: contenu ignoré
+            rooms.touch(ws, room)
+    except WebSocketDisconnect as e:
+        heartbeat.disconnected(e.code)
     finally:
-        await rooms.remove(ws, room)
\ No newline at end of file
+        await rooms.remove(ws, room)
+        release_room_listener(room)
\ No newline at end of file
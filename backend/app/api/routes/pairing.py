@@ -1,9 +1,26 @@
-from fastapi import APIRouter, Depends, Query, Form
-from app.db.uow import UnitOfWork, get_uow
-from app.services.pairing import create_pairing_code, claim_pairing_code
+import asyncio
+from fastapi import APIRouter, Depends, Query, Form, WebSocket, WebSocketDisconnect
+from app.db.uow import UnitOfWork, UowFactory, get_uow, get_uow_factory
+from app.services.overlay import (
+    Frame,
+    decode_frame,
+    encode_event,
+    ensure_room_listener,
+    release_room_listener,
+    rooms,
+)
+from app.services.pairing import (
+    create_pairing_code,
+    claim_pairing_code,
+    make_pairing_expired_event,
+    pairing_room,
+    seconds_left,
+)
 
 router = APIRouter(prefix="/pairing", tags=["pairing"])
 
+_CLAIM_GRACE_SECONDS = 1.0
+
 @router.post("")
 async def pairing_create(
     color: str = Form(...),
@@ -43,4 +60,73 @@ async def pairing_claim(
     Returns:
         dict: Result of the claim operation (success or error).
     """
-    return await claim_pairing_code(uow, code=code, user_id=twitch_user_id, channel=channel)
\ No newline at end of file
+    return await claim_pairing_code(uow, code=code, user_id=twitch_user_id, channel=channel)
+
+@router.websocket("/ws")
+async def pairing_ws(
+    ws: WebSocket,
+    code: str = Query(..., description="Pairing code to wait on"),
+    uow_factory: UowFactory = Depends(get_uow_factory),
+):
+    """
+    Lets a guest wait for the outcome of a pairing code instead of polling.
+
+    The socket joins the code's room, so the "pairing_claimed" event published by
+    claim_pairing_code reaches it through the regular send_event/broker path; once that frame
+    is sent, the socket is closed. If the code expires first, a "pairing_expired" event is
+    sent and the socket is closed. Either way the guest gets exactly one outcome.
+    The code is looked up once with a short-lived session; nothing is held while waiting.
+
+    Args:
+        ws (WebSocket): Guest WebSocket connection.
+        code (str): The pairing code.
+        uow_factory (UowFactory): Factory for the short-lived lookup.
+    """
+    room = pairing_room(code)
+    claimed = asyncio.get_running_loop().create_future()
+
+    def on_sent(frame: Frame):
+        # the room also carries heartbeat pings: only the claim ends the wait
+        if not claimed.done() and decode_frame(frame).get("type") == "pairing_claimed":
+            claimed.set_result(None)
+
+    drain = None
+    try:
+        # Subscribe before accepting, so a claim made once the handshake completes gets through
+        await ensure_room_listener(room)
+        await rooms.add(ws, room, on_sent=on_sent)
+        # Looked up after joining the room so a claim landing meanwhile is not missed
+        async with uow_factory() as uow:
+            rec = await uow.pairing.get(code)
+        if rec is None:
+            # A claim that landed between the join and the lookup is still on its way through
+            # the broker: give it a moment before telling the guest the code is unknown
+            await asyncio.wait({claimed}, timeout=_CLAIM_GRACE_SECONDS)
+            if claimed.done():
+                await ws.close()
+            else:
+                await ws.close(code=4404, reason="Unknown or already used code")
+            return
+        drain = asyncio.create_task(_drain(ws, room))
+        await asyncio.wait({drain, claimed}, timeout=seconds_left(rec), return_when=asyncio.FIRST_COMPLETED)
+        if drain.done():
+            drain.result()  # client went away: re-raises its WebSocketDisconnect
+        elif claimed.done():
+            await ws.close()
+        else:
+            await ws.send_text(encode_event(make_pairing_expired_event(code)))
+            await ws.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if drain is not None:
+            drain.cancel()
+            await asyncio.gather(drain, return_exceptions=True)
+        await rooms.remove(ws, room)
+        release_room_listener(room)
+
+async def _drain(ws: WebSocket, room: str):
+    """Reads client messages (heartbeat answers) until the socket closes."""
+    while True:
+        await ws.receive_text()
+        rooms.touch(ws, room)
@@ -1,9 +1,12 @@
+import secrets
 from typing import Annotated, Optional
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, Header, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from app.db.uow import UnitOfWork, get_uow
 from app.models.user import User
 from app.core.jwt import decode_access_token
+from app.core.settings import settings
+from app.core.user_cache import claims_versions
 
 # Reads Authorization: Bearer <token>
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -31,7 +34,7 @@ async def get_current_user(
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = await uow.users.get(user_id)
+    user = await uow.users.get_cached(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
@@ -48,3 +51,82 @@ async def auth_context(request: Request, user: CurrentUser):
         uid (str): Authenticated user identifier.
     """
     request.state.user = user  # Available everywhere in this router
+
+
+async def get_claims_user(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        uow: UnitOfWork = Depends(get_uow)
+        ) -> User:
+    """
+    Stateless variant of get_current_user for read-only endpoints.
+    Builds the user from the token's identity claims when they carry a claims_version
+    that is still current (see ClaimsVersions); otherwise, or when JWT_IDENTITY_CLAIMS is
+    off (versions are no longer recorded, so old tokens cannot be vouched for), falls back
+    to the database.
+
+    Args:
+        token (str): JWT access token extracted from the Authorization header.
+        uow (UnitOfWork): Unit of Work instance, only used on fallback.
+
+    Returns:
+        User: A detached user built from the claims, or the stored user.
+
+    Raises:
+        HTTPException: If the token is missing, invalid, or the user is not found.
+    """
+    if not settings.JWT_IDENTITY_CLAIMS:
+        return await get_current_user(token, uow)
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+    payload = decode_access_token(token)
+    user_id = payload.get("sub")
+    ver = payload.get("ver")
+    if user_id and ver is not None and "duck_color" in payload and await claims_versions.is_fresh(user_id, ver):
+        return User(id=user_id, display=payload.get("display"), duck_color=payload["duck_color"], claims_version=ver)
+    return await get_current_user(token, uow)
+
+CurrentClaims = Annotated[User, Depends(get_claims_user)]
+
+async def claims_context(request: Request, user: CurrentClaims):
+    """
+    Router-level alternative to auth_context that answers from token claims when fresh.
+    Use it on read-only routers; handlers that write should depend on CurrentUser.
+
+    Args:
+        request (Request): FastAPI request object containing the context.
+        user (CurrentClaims): Authenticated user (possibly built from claims).
+    """
+    request.state.user = user
+
+
+async def require_ingest_key(x_api_key: Annotated[Optional[str], Header()] = None) -> None:
+    """
+    Guards the chat ingestion API with the shared key configured in INGEST_API_KEY.
+
+    Args:
+        x_api_key (str | None): Value of the X-Api-Key header.
+
+    Raises:
+        HTTPException: 503 if ingestion is not configured, 401 if the key is missing or wrong.
+    """
+    if not settings.INGEST_API_KEY:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Ingestion disabled")
+    if not x_api_key or not secrets.compare_digest(x_api_key, settings.INGEST_API_KEY):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+async def require_metrics_access(x_api_key: Annotated[Optional[str], Header()] = None) -> None:
+    """
+    Guards /metrics: open outside production, behind the key configured in METRICS_API_KEY in prod.
+
+    Args:
+        x_api_key (str | None): Value of the X-Api-Key header.
+
+    Raises:
+        HTTPException: 404 in prod when no key is configured, 401 if the key is missing or wrong.
+    """
+    if settings.ENV != "prod":
+        return
+    if not settings.METRICS_API_KEY:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_api_key or not secrets.compare_digest(x_api_key, settings.METRICS_API_KEY):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
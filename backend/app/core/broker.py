@@ -0,0 +1,185 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, Iterable, Optional, Set, Tuple, Union
+import asyncio
+import logging
+from app.core import codec
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+Message = Union[dict, str, bytes]
+
+
+class Subscription(ABC):
+    """
+    A single subscriber whose channel set can grow and shrink at runtime.
+    Lets one process multiplex every room it serves over one broker connection.
+    """
+    @abstractmethod
+    async def subscribe(self, *channels: str) -> None: ...
+
+    @abstractmethod
+    async def unsubscribe(self, *channels: str) -> None: ...
+
+    @abstractmethod
+    async def get_message(self, timeout: float = 1.0) -> Optional[Tuple[str, Union[str, bytes]]]:
+        """
+        Waits up to `timeout` seconds for the next message.
+
+        Returns:
+            Optional[Tuple[str, str | bytes]]: (channel, raw payload), or None on timeout.
+        """
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+
+class Broker(ABC):
+    """
+    Pub/sub transport between the processes serving overlays.
+
+    Messages are fire-and-forget: only subscriptions live at publish time receive them, in
+    publish order per channel. Dict messages are JSON-encoded; str/bytes payloads are
+    treated as pre-encoded frames and delivered as is.
+    """
+    @abstractmethod
+    async def connect(self) -> None: ...
+
+    @abstractmethod
+    async def close(self) -> None: ...
+
+    @abstractmethod
+    async def publish(self, channel: str, message: Message) -> None: ...
+
+    @abstractmethod
+    async def open_subscription(self) -> Subscription:
+        """
+        Opens a multiplexed subscription; channels are added and removed on the returned object.
+        """
+
+    async def publish_many(self, channel: str, messages: Iterable[Message]) -> None:
+        """
+        Publishes several messages on one channel, in order.
+        """
+        for message in messages:
+            await self.publish(channel, message)
+
+    async def subscribe_raw(self, channel: str) -> AsyncIterator[Union[str, bytes]]:
+        """
+        Yields the payloads published on a channel exactly as received, without decoding them.
+        """
+        sub = await self.open_subscription()
+        await sub.subscribe(channel)
+        try:
+            while True:
+                msg = await sub.get_message(timeout=1.0)
+                if msg is not None:
+                    yield msg[1]
+        finally:
+            await sub.close()
+
+    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+        """
+        Yields the JSON-decoded messages published on a channel.
+        """
+        async for data in self.subscribe_raw(channel):
+            try:
+                yield codec.loads(data)
+            except Exception:
+                # non-JSON message: ignore
+                continue
+
+
+class InMemorySubscription(Subscription):
+    """Subscription to an InMemoryBroker: an unbounded queue fed by publish, like a Redis pubsub buffer."""
+    def __init__(self, broker: InMemoryBroker) -> None:
+        self._broker = broker
+        self._channels: Set[str] = set()
+        self._queue: asyncio.Queue[Tuple[str, Union[str, bytes]]] = asyncio.Queue()
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._channels.add(channel)
+            self._broker._subscribers.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in channels:
+            self._channels.discard(channel)
+            subs = self._broker._subscribers.get(channel)
+            if subs is not None:
+                subs.discard(self)
+                if not subs:
+                    del self._broker._subscribers[channel]
+
+    async def get_message(self, timeout: float = 1.0) -> Optional[Tuple[str, Union[str, bytes]]]:
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        await self.unsubscribe(*self._channels)
+
+
+class InMemoryBroker(Broker):
+    """
+    Broker confined to this process, for single-node deployments and tests.
+    Same semantics as RedisBroker without the network hop: publishing enqueues the frame
+    on every matching subscription before returning.
+    """
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set[InMemorySubscription]] = {}
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        for subs in list(self._subscribers.values()):
+            for sub in list(subs):
+                await sub.close()
+
+    async def publish(self, channel: str, message: Message) -> None:
+        if isinstance(message, dict):
+            message = codec.dumps(message)
+        for sub in self._subscribers.get(channel, ()):
+            sub._queue.put_nowait((channel, message))
+
+    async def open_subscription(self) -> InMemorySubscription:
+        return InMemorySubscription(self)
+
+
+async def connect_broker() -> Broker:
+    """
+    Creates and connects the broker selected by BROKER_BACKEND.
+
+    Returns:
+        Broker: A connected broker; the in-memory one if "redis"/"ipc" cannot connect and
+        BROKER_FALLBACK is "memory" (cross-process fan-out and cache invalidations are then lost).
+
+    Raises:
+        Exception: The connection error, unless BROKER_FALLBACK allows the in-memory broker.
+    """
+    if settings.BROKER_BACKEND == "memory":
+        return InMemoryBroker()
+    if settings.BROKER_BACKEND == "ipc":
+        from app.core.ipc_broker import IpcBroker
+        broker: Broker = IpcBroker(settings.IPC_BROKER_PATH)
+    else:
+        from app.core.redis_broker import RedisBroker
+        broker = RedisBroker(settings.REDIS_URL)
+    try:
+        await broker.connect()
+        return broker
+    except Exception as e:
+        await broker.close()
+        if settings.BROKER_FALLBACK != "memory":
+            logger.error("Cannot connect to the %s broker: %s", settings.BROKER_BACKEND, e)
+            raise
+        logger.error("Cannot connect to the %s broker, falling back to the in-memory broker "
+                     "(no fan-out across processes): %s", settings.BROKER_BACKEND, e)
+        return InMemoryBroker()
@@ -0,0 +1,59 @@
+"""
+JSON codec shared by the broker, the overlay rooms and HTTP responses.
+
+Uses orjson when it is installed (unless JSON_CODEC=json), the stdlib json module otherwise.
+Both backends emit the same compact UTF-8 JSON, so workers on different backends interoperate,
+and accept what the stdlib accepts (non-str dict keys, big ints), so responses match JSONResponse.
+"""
+import json
+from typing import Any
+from fastapi.responses import JSONResponse
+from app.core.settings import settings
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if settings.JSON_CODEC == "orjson" and orjson is None:
+    raise RuntimeError("JSON_CODEC=orjson but the orjson package is not installed")
+
+BACKEND = "orjson" if orjson is not None and settings.JSON_CODEC != "json" else "json"
+
+_encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+
+if BACKEND == "orjson":
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """
+        Serializes a value to compact UTF-8 JSON, without going through str.
+        Values orjson rejects but the stdlib encodes (ints beyond 64 bits, ...) go through json.
+        """
+        try:
+            return orjson.dumps(obj, option=_OPTIONS)
+        except TypeError:
+            return _encoder.encode(obj).encode()
+
+    def dumps(obj: Any) -> str:
+        """Serializes a value to compact JSON text."""
+        return dumps_bytes(obj).decode()
+
+    loads = orjson.loads
+else:
+    def dumps(obj: Any) -> str:
+        """Serializes a value to compact JSON text."""
+        return _encoder.encode(obj)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serializes a value to compact UTF-8 JSON."""
+        return _encoder.encode(obj).encode()
+
+    loads = json.loads
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class of the app: same body as JSONResponse, rendered by the shared codec.
+    """
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
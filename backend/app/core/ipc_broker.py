@@ -0,0 +1,238 @@
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Set, Tuple, Union
+import asyncio
+import fcntl
+import os
+import struct
+from app.core import codec
+from app.core.broker import Broker, Message, Subscription
+from app.core.settings import settings
+
+# Wire protocol between workers and the hub: header (op, channel length, payload length),
+# then the channel name and the payload. The BYTES flag keeps str and bytes frames apart.
+_HEADER = struct.Struct(">BHI")
+_SUB, _UNSUB, _PUB, _MSG = 1, 2, 3, 4
+_BYTES = 0x80
+
+def _pack(op: int, channel: str, payload: Union[str, bytes] = b"") -> bytes:
+    if isinstance(payload, str):
+        payload = payload.encode()
+    else:
+        op |= _BYTES
+    name = channel.encode()
+    return _HEADER.pack(op, len(name), len(payload)) + name + payload
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, str, bytes]:
+    op, name_len, payload_len = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    body = await reader.readexactly(name_len + payload_len)
+    return op, body[:name_len].decode(), body[name_len:]
+
+
+class IpcHub:
+    """
+    Fan-out server on a Unix socket, run inside one of the workers (the one holding the lock file).
+    Each published frame is packed once and written as is to every subscribed connection;
+    a subscriber whose unsent backlog exceeds `max_buffer` bytes is disconnected, like
+    Redis does with its pubsub output buffer limit.
+    """
+    def __init__(self, path: str, max_buffer: int):
+        self.path = path
+        self.max_buffer = max_buffer
+        self._subs: Dict[str, Set[asyncio.StreamWriter]] = {}
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        try:
+            os.unlink(self.path)  # stale socket of a dead hub; we hold the lock
+        except FileNotFoundError:
+            pass
+        self._server = await asyncio.start_unix_server(self._serve, self.path)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        channels: Set[str] = set()
+        self._clients.add(writer)
+        try:
+            while True:
+                op, channel, payload = await _read_frame(reader)
+                kind = op & ~_BYTES
+                if kind == _PUB:
+                    self._fan_out(op, channel, payload)
+                elif kind == _SUB:
+                    channels.add(channel)
+                    self._subs.setdefault(channel, set()).add(writer)
+                elif kind == _UNSUB:
+                    channels.discard(channel)
+                    self._drop(channel, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for channel in channels:
+                self._drop(channel, writer)
+            self._clients.discard(writer)
+            writer.close()
+
+    def _fan_out(self, op: int, channel: str, payload: bytes) -> None:
+        subs = self._subs.get(channel)
+        if not subs:
+            return
+        name = channel.encode()
+        frame = _HEADER.pack(_MSG | (op & _BYTES), len(name), len(payload)) + name + payload
+        for writer in list(subs):
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                writer.close()  # too slow: its reader loop unsubscribes it
+                continue
+            writer.write(frame)
+
+    def _drop(self, channel: str, writer: asyncio.StreamWriter) -> None:
+        subs = self._subs.get(channel)
+        if subs is not None:
+            subs.discard(writer)
+            if not subs:
+                del self._subs[channel]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class IpcSubscription(Subscription):
+    """
+    Subscription over its own connection to the hub. A reader task turns incoming frames into
+    a queue, so get_message timeouts never cut a frame in half; a lost hub surfaces as
+    ConnectionError, and the caller reopens a subscription (possibly electing a new hub).
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writer = writer
+        self._channels: Set[str] = set()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._read(reader))
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                op, channel, payload = await _read_frame(reader)
+                self._queue.put_nowait((channel, payload if op & _BYTES else payload.decode()))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self._queue.put_nowait(ConnectionError(f"IPC broker hub went away: {e!r}"))
+
+    async def subscribe(self, *channels: str) -> None:
+        if channels:
+            self._channels.update(channels)
+            self._writer.write(b"".join(_pack(_SUB, c) for c in channels))
+            await self._writer.drain()
+
+    async def unsubscribe(self, *channels: str) -> None:
+        if channels:
+            self._channels.difference_update(channels)
+            self._writer.write(b"".join(_pack(_UNSUB, c) for c in channels))
+            await self._writer.drain()
+
+    async def get_message(self, timeout: float = 1.0) -> Optional[Tuple[str, Union[str, bytes]]]:
+        try:
+            item = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if isinstance(item, Exception):
+            self._queue.put_nowait(item)  # stay broken
+            raise item
+        return item
+
+    async def close(self) -> None:
+        self._task.cancel()
+        self._writer.close()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+class IpcBroker(Broker):
+    """
+    Broker linking the worker processes of one host over a Unix-domain socket, without Redis.
+
+    The first worker to take an exclusive lock on `<path>.lock` runs the hub in-process;
+    every worker, the hub's own included, talks to it as a client. When the hub's worker
+    exits, the OS releases the lock and the next worker to reconnect takes over.
+    """
+    def __init__(self, path: Optional[str] = None, max_buffer: Optional[int] = None) -> None:
+        self.path = path or settings.IPC_BROKER_PATH
+        self.max_buffer = settings.IPC_BROKER_MAX_BUFFER if max_buffer is None else max_buffer
+        self._hub: Optional[IpcHub] = None
+        self._lock_fd: Optional[int] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    @property
+    def is_hub(self) -> bool:
+        return self._hub is not None
+
+    def _try_lock(self) -> bool:
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _open(self, wait: float = 2.0) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Connects to the hub, becoming the hub first if nobody holds the lock."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while True:
+            try:
+                return await asyncio.open_unix_connection(self.path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if self._hub is None and self._try_lock():
+                    hub = IpcHub(self.path, self.max_buffer)
+                    await hub.start()
+                    self._hub = hub
+                    continue
+                if loop.time() > deadline:
+                    raise ConnectionError(f"No IPC broker hub listening on {self.path}")
+                await asyncio.sleep(0.02)  # the lock holder is still starting its hub
+
+    async def connect(self) -> None:
+        if self._writer is None or self._writer.is_closing():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            _, self._writer = await self._open()
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._hub is not None:
+            await self._hub.close()
+            self._hub = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # releases the lock: another worker takes over
+            self._lock_fd = None
+
+    async def publish(self, channel: str, message: Message) -> None:
+        await self.publish_many(channel, (message,))
+
+    async def publish_many(self, channel: str, messages: Iterable[Message]) -> None:
+        data = b"".join(_pack(_PUB, channel, codec.dumps(m) if isinstance(m, dict) else m) for m in messages)
+        for attempt in (1, 2):
+            await self.connect()
+            assert self._writer
+            try:
+                self._writer.write(data)
+                await self._writer.drain()
+                return
+            except ConnectionError:
+                self._writer = None  # hub restarted: reconnect once
+                if attempt == 2:
+                    raise
+
+    async def open_subscription(self) -> IpcSubscription:
+        await self.connect()
+        return IpcSubscription(*await self._open())
@@ -1,26 +1,42 @@
 from datetime import datetime, timedelta, timezone
+import hashlib
+import time
+from typing import TYPE_CHECKING, Optional
 from jose import jwt, ExpiredSignatureError, JWTError
 from app.core.settings import settings
+from app.utils.cache import TTLCache
 from fastapi import HTTPException, status
 
-def create_access_token(payload: dict) -> str:
+if TYPE_CHECKING:
+    from app.models.user import User
+
+def create_access_token(payload: dict, user: Optional["User"] = None) -> str:
     """
     Creates a JWT access token with the given payload.
+    With JWT_IDENTITY_CLAIMS enabled and a user given, the token also carries the user's
+    identity (display, duck_color) and claims_version, for stateless read-only endpoints.
 
     Args:
         payload (dict): The payload to include in the token.
+        user (Optional[User]): The user the token is issued to.
 
     Returns:
         str: The encoded JWT token.
     """
     to_encode = payload.copy()
+    if user is not None and settings.JWT_IDENTITY_CLAIMS:
+        to_encode.update({
+            "display": user.display,
+            "duck_color": user.duck_color,
+            "ver": user.claims_version or 0,
+        })
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
-def decode_access_token(token: str) -> dict:
+def _verify(token: str) -> dict:
     """
-    Decodes a JWT access token.
+    Verifies a JWT signature and claims without caching.
 
     Args:
         token (str): The JWT token to decode.
@@ -29,7 +45,7 @@ def decode_access_token(token: str) -> dict:
         dict: The decoded payload.
 
     Raises:
-        jwt.JWTError: If the token is invalid or expired.
+        HTTPException: If the token is invalid or expired (401).
     """
     try:
         return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
@@ -37,4 +53,39 @@ def decode_access_token(token: str) -> dict:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        
\ No newline at end of file
+
+# Already-verified payloads keyed by the SHA-256 of the token
+token_cache: TTLCache[dict] = TTLCache(maxsize=settings.JWT_CACHE_SIZE, ttl=settings.JWT_CACHE_TTL_SECONDS)
+_token_cache_key: tuple[str, str] | None = None  # signing key the cached entries were verified with
+
+def decode_access_token(token: str) -> dict:
+    """
+    Decodes a JWT access token, reusing a previous verification of the same token.
+    Cached entries expire no later than the token's `exp` and are dropped when the signing key changes.
+
+    Args:
+        token (str): The JWT token to decode.
+
+    Returns:
+        dict: The decoded payload.
+
+    Raises:
+        HTTPException: If the token is invalid or expired (401).
+    """
+    global _token_cache_key
+    signing_key = (settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+    if signing_key != _token_cache_key:
+        token_cache.clear()
+        _token_cache_key = signing_key
+
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return dict(payload)
+
+    payload = _verify(token)
+    exp = payload.get("exp")
+    ttl = settings.JWT_CACHE_TTL_SECONDS if exp is None else min(settings.JWT_CACHE_TTL_SECONDS, exp - time.time())
+    if ttl > 0:
+        token_cache.set(digest, dict(payload), ttl=ttl)
+    return payload
@@ -1,10 +1,49 @@
 from __future__ import annotations
-from typing import AsyncIterator, Optional
-import json
+from typing import Iterable, Optional, Tuple, Union
+import asyncio
 import redis.asyncio as redis
+from redis.asyncio.client import PubSub
+from app.core import codec
+from app.core.broker import Broker, Subscription
 from app.core.settings import settings
 
-class RedisBroker:
+class RedisSubscription(Subscription):
+    """
+    A single pubsub connection whose channel set can grow and shrink at runtime.
+    Lets one process multiplex every room it serves over one Redis connection.
+    """
+    def __init__(self, pubsub: PubSub) -> None:
+        self._pubsub = pubsub
+
+    async def subscribe(self, *channels: str) -> None:
+        if channels:
+            await self._pubsub.subscribe(*channels)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        if channels:
+            await self._pubsub.unsubscribe(*channels)
+
+    async def get_message(self, timeout: float = 1.0) -> Optional[Tuple[str, Union[str, bytes]]]:
+        """
+        Waits up to `timeout` seconds for the next message.
+
+        Returns:
+            Optional[Tuple[str, str | bytes]]: (channel, raw payload), or None on timeout.
+        """
+        if not self._pubsub.subscribed:
+            await asyncio.sleep(timeout)  # nothing to read until a channel is added
+            return None
+        raw = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if not raw or raw.get("type") != "message" or not raw.get("data"):
+            return None
+        return raw["channel"], raw["data"]
+
+    async def close(self) -> None:
+        await self._pubsub.aclose()
+
+
+class RedisBroker(Broker):
+    """Broker over Redis pub/sub: fans out across every process and host sharing REDIS_URL."""
     def __init__(self, url: Optional[str] = None) -> None:
         self.url = url or settings.REDIS_URL
         self._client: Optional[redis.Redis] = None
@@ -20,30 +59,51 @@ class RedisBroker:
             await self._client.aclose()
             self._client = None
 
-    async def publish(self, channel: str, message: dict) -> None:
+    async def publish(self, channel: str, message: Union[dict, str, bytes]) -> None:
+        """
+        Publishes a message; str/bytes payloads are treated as pre-encoded frames and sent as is.
+        """
         await self.connect()
         assert self._client
-        await self._client.publish(channel, json.dumps(message, separators=(",", ":")))
+        if isinstance(message, dict):
+            message = codec.dumps(message)
+        await self._client.publish(channel, message)
 
-    async def subscribe(self, channel: str) -> AsyncIterator[dict]:
+    async def publish_many(self, channel: str, messages: Iterable[Union[dict, str, bytes]]) -> None:
+        """
+        Publishes several messages on one channel in a single pipelined round trip, in order.
+        """
         await self.connect()
         assert self._client
-        pubsub = self._client.pubsub()
-        await pubsub.subscribe(channel)
-        try:
-            async for raw in pubsub.listen():
-                if raw is None:  # safety check
-                    continue
-                if raw.get("type") != "message":
-                    continue
-                data = raw.get("data")
-                if not data:
-                    continue
-                try:
-                    yield json.loads(data)
-                except Exception:
-                    # non-JSON message: ignore
-                    continue
-        finally:
-            await pubsub.unsubscribe(channel)
-            await pubsub.aclose()
\ No newline at end of file
+        async with self._client.pipeline(transaction=False) as pipe:
+            for message in messages:
+                pipe.publish(channel, codec.dumps(message) if isinstance(message, dict) else message)
+            await pipe.execute()
+
+    async def open_subscription(self) -> RedisSubscription:
+        """
+        Opens a multiplexed subscription; channels are added and removed on the returned object.
+        """
+        await self.connect()
+        assert self._client
+        return RedisSubscription(self._client.pubsub())
+
+
+_data_client: Optional[redis.Redis] = None
+
+def get_redis_client() -> redis.Redis:
+    """
+    Returns the process-wide Redis client used for data access (e.g. pairing codes),
+    separate from the broker's pub/sub connection. Connections are opened lazily.
+    """
+    global _data_client
+    if _data_client is None:
+        _data_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _data_client
+
+async def close_redis_client() -> None:
+    """Closes the data client opened by get_redis_client, if any (application shutdown)."""
+    global _data_client
+    client, _data_client = _data_client, None
+    if client is not None:
+        await client.aclose()
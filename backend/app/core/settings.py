@@ -21,17 +21,94 @@ class Settings:
         ENV (str): Current environment ("dev" by default).
         CORS_ORIGINS (List[str]): Allowed CORS origins.
         DATABASE_URL (str): Database connection URL.
+        BROKER_BACKEND (str): Overlay fan-out, "redis" (default), "ipc" (worker processes of one host, no Redis)
+            or "memory" (this process only).
+        BROKER_FALLBACK (str): "memory" to start on the in-memory broker when redis/ipc cannot connect
+            (single-process setups); empty (default) fails startup instead.
+        IPC_BROKER_PATH (str): Unix socket of the "ipc" broker hub (a "<path>.lock" file elects the hub).
+        IPC_BROKER_MAX_BUFFER (int): Unsent bytes the hub queues per subscriber before disconnecting it.
         PAIRING_CODE_EXPIRY_SECONDS (int): Validity duration for pairing codes (seconds).
+        PAIRING_CODE_LENGTH (int): Characters per pairing code (5 bits each).
+        PAIRING_CODE_MAX_ATTEMPTS (int): Fresh codes drawn on collision before giving up.
+        PAIRING_BACKEND (str): Pairing code storage, "sql" (default) or "redis" (keys with native TTLs).
+        PAIRING_SWEEP_INTERVAL_SECONDS (float): Delay between two sweeps of expired pairing codes (0 disables).
+        PAIRING_SWEEP_BATCH_SIZE (int): Max expired codes deleted per sweep transaction.
+        OVERLAY_SEND_QUEUE_SIZE (int): Max frames buffered per overlay WebSocket before dropping the oldest.
+        OVERLAY_MAX_DROPPED_FRAMES (int): Consecutive dropped frames before a slow socket is disconnected (0 = never).
+        OVERLAY_ROOM_LINGER_SECONDS (float): Delay before an empty room's broker subscription is torn down.
+        OVERLAY_HEARTBEAT_SECONDS (float): Interval of the shared heartbeat pinging every overlay socket (0 disables).
+        OVERLAY_HEARTBEAT_MAX_MISSED (int): Unanswered pings before a socket that answered before is closed.
+        OVERLAY_HEARTBEAT_REAP_SILENT (bool): Also close sockets that never answered a ping (once every overlay answers).
+        OVERLAY_DEFLATE_LEVEL (int): zlib level for frames sent to sockets that negotiated deflate.
+        USER_CACHE_SIZE (int): Max authenticated users cached per worker (0 disables the cache).
+        USER_CACHE_TTL_SECONDS (float): Lifetime of a cached user.
+        DUCK_COLOR_CACHE_SIZE (int): Max user -> duck color entries kept for chat enrichment (0 disables the cache).
+        DUCK_COLOR_CACHE_TTL_SECONDS (float): Lifetime of a cached color (duck_update events refresh it sooner).
+        JWT_IDENTITY_CLAIMS (bool): Embed display, duck_color and claims_version in access tokens
+            (newest versions are kept in Redis under REDIS_CLAIMS_PREFIX; without Redis, reads use the DB).
+        JWT_CACHE_SIZE (int): Max verified tokens cached per worker (0 disables the cache).
+        JWT_CACHE_TTL_SECONDS (float): Upper bound on a cached token's lifetime (its `exp` always applies).
+        INGEST_API_KEY (str): Key chat bridges send in X-Api-Key to push chat (empty disables ingestion).
+        INGEST_MAX_BATCH (int): Max chat messages per ingestion request.
+        METRICS_API_KEY (str): Key required in X-Api-Key to read /metrics in prod (empty hides it there).
+        IRC_HOST (str): Twitch IRC server for the chat ingestion worker.
+        IRC_PORT (int): Twitch IRC port (plain TCP).
+        IRC_NICK (str): IRC login; "justinfan<digits>" reads chat anonymously.
+        IRC_TOKEN (str): "oauth:<token>" for IRC_NICK (empty for anonymous logins).
+        IRC_CHANNELS (List[str]): Channel logins the worker joins by default.
+        IRC_CHANNELS_PER_CONNECTION (int): Channels joined per IRC connection.
+        IRC_QUEUE_SIZE (int): Capacity of each pipeline queue before upstream stages wait.
+        IRC_BATCH_SIZE (int): Max messages per color lookup and per broker pipeline.
+        JSON_CODEC (str): JSON backend, "auto" (orjson when installed), "orjson" or "json" (stdlib).
     """
     def __init__(self) -> None:
         self.ENV: str = os.getenv("ENV", "dev").lower()
         self.CORS_ORIGINS: List[str] = _parse_csv(os.getenv("CORS_ORIGINS")) or ["http://localhost:5173"]
         self.DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./var/dev.db")
         self.PAIRING_CODE_EXPIRY_SECONDS: int = int(os.getenv("PAIRING_CODE_EXPIRY_SECONDS", "300"))
+        self.PAIRING_CODE_LENGTH: int = int(os.getenv("PAIRING_CODE_LENGTH", "8"))
+        self.PAIRING_CODE_MAX_ATTEMPTS: int = int(os.getenv("PAIRING_CODE_MAX_ATTEMPTS", "8"))
+        self.PAIRING_BACKEND: str = os.getenv("PAIRING_BACKEND", "sql").lower()
+        self.PAIRING_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("PAIRING_SWEEP_INTERVAL_SECONDS", "60"))
+        self.PAIRING_SWEEP_BATCH_SIZE: int = int(os.getenv("PAIRING_SWEEP_BATCH_SIZE", "500"))
         self.JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "dev-secret")
         self.JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
         self.JWT_EXPIRE_MINUTES: int = int(os.getenv("JWT_EXPIRE_MINUTES", "60"))
+        self.JWT_IDENTITY_CLAIMS: bool = os.getenv("JWT_IDENTITY_CLAIMS", "false").lower() in ("1", "true", "yes")
+        self.JWT_CACHE_SIZE: int = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+        self.JWT_CACHE_TTL_SECONDS: float = float(os.getenv("JWT_CACHE_TTL_SECONDS", "300"))
+        self.BROKER_BACKEND: str = os.getenv("BROKER_BACKEND", "redis").lower()
+        self.BROKER_FALLBACK: str = os.getenv("BROKER_FALLBACK", "").lower()
+        self.IPC_BROKER_PATH: str = os.getenv("IPC_BROKER_PATH", "./var/broker.sock")
+        self.IPC_BROKER_MAX_BUFFER: int = int(os.getenv("IPC_BROKER_MAX_BUFFER", str(8 * 1024 * 1024)))
         self.REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
         self.REDIS_OVERLAY_PREFIX = os.getenv("REDIS_OVERLAY_PREFIX", "overlay")
+        self.REDIS_PAIRING_PREFIX = os.getenv("REDIS_PAIRING_PREFIX", "pairing")
+        self.REDIS_CLAIMS_PREFIX = os.getenv("REDIS_CLAIMS_PREFIX", "claims")
+        self.REDIS_USERS_CHANNEL = os.getenv("REDIS_USERS_CHANNEL", "users:invalidate")
+        self.REDIS_DUCKS_CHANNEL = os.getenv("REDIS_DUCKS_CHANNEL", "ducks:updates")
+        self.OVERLAY_SEND_QUEUE_SIZE: int = int(os.getenv("OVERLAY_SEND_QUEUE_SIZE", "256"))
+        self.OVERLAY_MAX_DROPPED_FRAMES: int = int(os.getenv("OVERLAY_MAX_DROPPED_FRAMES", "1024"))
+        self.OVERLAY_ROOM_LINGER_SECONDS: float = float(os.getenv("OVERLAY_ROOM_LINGER_SECONDS", "5"))
+        self.OVERLAY_HEARTBEAT_SECONDS: float = float(os.getenv("OVERLAY_HEARTBEAT_SECONDS", "20"))
+        self.OVERLAY_HEARTBEAT_MAX_MISSED: int = int(os.getenv("OVERLAY_HEARTBEAT_MAX_MISSED", "3"))
+        self.OVERLAY_HEARTBEAT_REAP_SILENT: bool = os.getenv("OVERLAY_HEARTBEAT_REAP_SILENT", "false").lower() in ("1", "true", "yes")
+        self.OVERLAY_DEFLATE_LEVEL: int = int(os.getenv("OVERLAY_DEFLATE_LEVEL", "6"))
+        self.USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+        self.USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+        self.INGEST_API_KEY: str = os.getenv("INGEST_API_KEY", "")
+        self.INGEST_MAX_BATCH: int = int(os.getenv("INGEST_MAX_BATCH", "500"))
+        self.METRICS_API_KEY: str = os.getenv("METRICS_API_KEY", "")
+        self.IRC_HOST: str = os.getenv("IRC_HOST", "irc.chat.twitch.tv")
+        self.IRC_PORT: int = int(os.getenv("IRC_PORT", "6667"))
+        self.IRC_NICK: str = os.getenv("IRC_NICK", "justinfan31337")
+        self.IRC_TOKEN: str = os.getenv("IRC_TOKEN", "")
+        self.IRC_CHANNELS: List[str] = _parse_csv(os.getenv("IRC_CHANNELS"))
+        self.IRC_CHANNELS_PER_CONNECTION: int = int(os.getenv("IRC_CHANNELS_PER_CONNECTION", "50"))
+        self.IRC_QUEUE_SIZE: int = int(os.getenv("IRC_QUEUE_SIZE", "1000"))
+        self.IRC_BATCH_SIZE: int = int(os.getenv("IRC_BATCH_SIZE", "100"))
+        self.DUCK_COLOR_CACHE_SIZE: int = int(os.getenv("DUCK_COLOR_CACHE_SIZE", "100000"))
+        self.DUCK_COLOR_CACHE_TTL_SECONDS: float = float(os.getenv("DUCK_COLOR_CACHE_TTL_SECONDS", "3600"))
+        self.JSON_CODEC: str = os.getenv("JSON_CODEC", "auto").lower()
 
 settings = Settings()
\ No newline at end of file
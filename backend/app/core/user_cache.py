@@ -0,0 +1,229 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Set
+from app.core import codec
+from app.core.settings import settings
+from app.models.user import User
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Authenticated users by id (JWT "sub"); holds detached snapshots, never session-bound rows
+user_cache: TTLCache[User] = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+class ClaimsVersions:
+    """
+    Newest claims_version per user, so identity claims carried by a token can be checked for
+    staleness without a DB read.
+
+    The authoritative copy is a Redis key per changed user, kept as long as an access token
+    lives (every token minted before the change has expired by then), so restarts, LRU
+    evictions and missed invalidation messages never let a stale token through. Each worker
+    keeps what it read for USER_CACHE_TTL_SECONDS; invalidation messages update it sooner.
+    When Redis cannot be reached, tokens are treated as stale and callers use the database.
+    """
+    def __init__(self, maxsize: int, ttl: float, prefix: Optional[str] = None, client=None):
+        self._seen: TTLCache[int] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.prefix = settings.REDIS_CLAIMS_PREFIX if prefix is None else prefix
+        self.client = client  # redis.asyncio.Redis; defaults to get_redis_client()
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    def _store(self):
+        if self.client is None:
+            from app.core.redis_broker import get_redis_client
+            return get_redis_client()
+        return self.client
+
+    def observe(self, user_id: str, version: int) -> None:
+        """Records a committed claims_version for a user in this worker (older values are ignored)."""
+        current = self._seen.get(user_id)
+        if current is None or version > current:
+            self._seen.set(user_id, version)
+
+    async def record(self, changed: Mapping[str, int]) -> None:
+        """
+        Stores committed claims_versions in Redis for every worker, and in this worker.
+
+        Args:
+            changed (Mapping[str, int]): New claims_version of each user that changed.
+        """
+        for uid, version in changed.items():
+            self.observe(uid, version)
+        ttl = settings.JWT_EXPIRE_MINUTES * 60
+        try:
+            async with self._store().pipeline(transaction=False) as pipe:
+                for uid, version in changed.items():
+                    pipe.set(self._key(uid), version, ex=ttl)
+                await pipe.execute()
+        except Exception as e:
+            # the write is committed already; other workers only catch up through invalidations
+            logger.error("Could not store claims versions for %s: %s", list(changed), e)
+
+    async def is_fresh(self, user_id: str, version: int) -> bool:
+        """
+        Checks a token's claims_version against the newest one committed for the user.
+
+        Args:
+            user_id (str): User identifier.
+            version (int): claims_version carried by the token.
+
+        Returns:
+            bool: False if a newer claims_version exists, or if Redis could not be asked.
+        """
+        known = self._seen.get(user_id)
+        if known is None:
+            try:
+                raw = await self._store().get(self._key(user_id))
+            except Exception as e:
+                logger.warning("Claims version lookup failed, using the database: %s", e)
+                return False
+            known = int(raw or 0)  # no key: no identity change within a token's lifetime
+            self._seen.set(user_id, known)
+        return version >= known
+
+    def clear(self) -> None:
+        self._seen.clear()
+
+claims_versions = ClaimsVersions(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+class DuckColorCache:
+    """
+    user_id -> duck_color lookups for chat enrichment, LRU-bounded.
+
+    Misses are filled in one batch through a loader, and users the loader does not know are
+    remembered too (chatters without an account), so steady-state enrichment never reaches
+    the database. Entries are updated in place by duck_update events and dropped by user
+    invalidations; the TTL only bounds how long a missed update could linger. An update or
+    invalidation landing while a load is in flight wins over the loaded (older) value.
+    """
+    _UNKNOWN = ""  # cached "no such user": served as a miss to callers, never reloaded
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._colors: TTLCache[str] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._loading: Dict[str, int] = {}  # user id -> loads in flight
+        self._raced: Set[str] = set()       # ids updated or dropped while being loaded
+
+    async def get_many(self, user_ids: Iterable[str],
+                       load: Callable[[list[str]], Awaitable[Dict[str, str]]]) -> Dict[str, str]:
+        """
+        Resolves many users' duck colors, calling `load` once for all misses.
+
+        Args:
+            user_ids (Iterable[str]): User identifiers (duplicates allowed).
+            load (Callable): Async loader mapping the missing ids to their colors (e.g. UsersRepository.get_colors).
+
+        Returns:
+            Dict[str, str]: user id -> duck color, for users that exist.
+        """
+        colors: Dict[str, str] = {}
+        missing = []
+        for uid in set(user_ids):
+            color = self._colors.get(uid)
+            if color is None:
+                missing.append(uid)
+            elif color:
+                colors[uid] = color
+        if missing:
+            for uid in missing:
+                self._loading[uid] = self._loading.get(uid, 0) + 1
+            try:
+                loaded = await load(missing)
+            finally:
+                raced = self._finish_load(missing)
+            for uid in missing:
+                color = loaded.get(uid)
+                if uid in raced:
+                    # changed during the load: keep the newer cached color, never the loaded one
+                    color = self._colors.get(uid) or color
+                else:
+                    self._colors.set(uid, color or self._UNKNOWN)
+                if color:
+                    colors[uid] = color
+        return colors
+
+    def _finish_load(self, user_ids: list[str]) -> Set[str]:
+        """Ends a load; returns the ids that were updated or dropped while it ran."""
+        raced = {uid for uid in user_ids if uid in self._raced}
+        for uid in user_ids:
+            pending = self._loading[uid] - 1
+            if pending:
+                self._loading[uid] = pending
+            else:
+                del self._loading[uid]
+                self._raced.discard(uid)
+        return raced
+
+    def _touched(self, user_id: str) -> None:
+        if user_id in self._loading:
+            self._raced.add(user_id)
+
+    def observe(self, payload: Mapping[str, Any]) -> None:
+        """Applies a duck_update event payload (other events are ignored)."""
+        if payload.get("type") == "duck_update":
+            self._touched(payload["user_id"])
+            self._colors.set(payload["user_id"], payload["duck"]["duck_color"])
+
+    def pop(self, user_id: str) -> None:
+        self._touched(user_id)
+        self._colors.pop(user_id)
+
+    def clear(self) -> None:
+        self._colors.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._colors.stats()
+
+duck_colors = DuckColorCache(maxsize=settings.DUCK_COLOR_CACHE_SIZE, ttl=settings.DUCK_COLOR_CACHE_TTL_SECONDS)
+
+def snapshot(user: User) -> User:
+    """
+    Returns a detached copy of a user suitable for sharing across requests.
+
+    Args:
+        user (User): The user loaded from the database.
+
+    Returns:
+        User: A transient User with the same identity fields.
+    """
+    return User(id=user.id, display=user.display, duck_color=user.duck_color, claims_version=user.claims_version)
+
+def _get_broker():
+    from app.main import app
+    return getattr(app.state, "broker", None)
+
+async def publish_user_invalidation(changed: Mapping[str, int]) -> None:
+    """
+    Tells the other workers to drop their cached copy of the given users
+    and to treat tokens carrying an older claims_version as stale.
+
+    Args:
+        changed (Mapping[str, int]): New claims_version of each user that changed.
+    """
+    broker = _get_broker()
+    if broker is None:
+        return
+    for uid, version in changed.items():
+        await broker.publish(settings.REDIS_USERS_CHANNEL, {"user_id": uid, "ver": version})
+
+async def handle_user_invalidation(frame: str | bytes) -> None:
+    """
+    Broker handler applying a change announced by publish_user_invalidation.
+
+    Args:
+        frame (str | bytes): JSON object with the user id and its new claims_version.
+    """
+    msg = codec.loads(frame)
+    user_cache.pop(msg["user_id"])
+    duck_colors.pop(msg["user_id"])
+    claims_versions.observe(msg["user_id"], msg["ver"])
+
+async def handle_duck_update(frame: str | bytes) -> None:
+    """
+    Broker handler keeping duck_colors current from the duck_update events announced on
+    REDIS_DUCKS_CHANNEL (see app.services.overlay.send_event).
+
+    Args:
+        frame (str | bytes): Encoded duck_update event.
+    """
+    duck_colors.observe(codec.loads(frame))
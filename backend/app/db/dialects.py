@@ -0,0 +1,18 @@
+from typing import Callable, Optional
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Dialects supporting INSERT ... ON CONFLICT ... RETURNING
+_ON_CONFLICT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+def on_conflict_insert(session: AsyncSession) -> Optional[Callable]:
+    """
+    Returns the dialect-specific insert() construct supporting ON CONFLICT for the session's database.
+
+    Args:
+        session (AsyncSession): The session whose bind decides the dialect.
+
+    Returns:
+        Optional[Callable]: The insert() factory, or None if the dialect has no ON CONFLICT.
+    """
+    return _ON_CONFLICT_INSERTS.get(session.get_bind().dialect.name)
@@ -1,37 +1,124 @@
-from typing import AsyncIterator
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_session
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator, Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.core.redis_broker import get_redis_client
+from app.core.settings import settings
+from app.core.user_cache import claims_versions, publish_user_invalidation, user_cache
+from app.db.session import SessionLocal
 from app.repository.user import UsersRepository
-from app.repository.pairing import PairingRepository
+from app.repository.pairing import PairingRepository, RedisPairingRepository
+
+logger = logging.getLogger(__name__)
 
 class UnitOfWork:
     """
     Unit of Work pattern for managing database transactions and repositories.
 
+    The session and the repositories are created on first access, so a request that
+    never touches the database never opens a session nor checks out a connection.
+
     Attributes:
         session (AsyncSession): The database session for this unit of work.
         users (UsersRepository): Repository for user operations.
+        pairing (PairingRepository | RedisPairingRepository): Repository for pairing code operations,
+            backed by SQL or Redis depending on settings.PAIRING_BACKEND.
     """
-    def __init__(self, session: AsyncSession):
-        self.session = session
-        self.users = UsersRepository(session)
-        self.pairing = PairingRepository(session)
+    def __init__(self, session: Optional[AsyncSession] = None, session_factory: async_sessionmaker = SessionLocal):
+        self._session = session
+        self._owns_session = session is None
+        self._session_factory = session_factory
+        self._users: Optional[UsersRepository] = None
+        self._pairing: Optional[PairingRepository | RedisPairingRepository] = None
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    @property
+    def users(self) -> UsersRepository:
+        if self._users is None:
+            self._users = UsersRepository(self.session)
+        return self._users
+
+    @property
+    def pairing(self) -> PairingRepository | RedisPairingRepository:
+        if self._pairing is None:
+            if settings.PAIRING_BACKEND == "redis":
+                self._pairing = RedisPairingRepository(get_redis_client())
+            else:
+                self._pairing = PairingRepository(self.session)
+        return self._pairing
+
+    @property
+    def started(self) -> bool:
+        """Whether a session has been opened."""
+        return self._session is not None
 
     async def commit(self):
-        """Commits the current transaction."""
-        await self.session.commit()
+        """
+        Commits the current transaction, then announces changed users to other workers.
+        A failed announcement is logged, never raised: the write itself has succeeded.
+        """
+        if self._session is None:
+            return  # nothing was read or written
+        await self._session.commit()
+        if self._users is not None and self._users.changed:
+            changed, self._users.changed = self._users.changed, {}
+            for uid in changed:
+                user_cache.pop(uid)  # a concurrent read may have re-cached the pre-commit row
+            if settings.JWT_IDENTITY_CLAIMS:
+                await claims_versions.record(changed)
+            try:
+                await publish_user_invalidation(changed)
+            except Exception as e:
+                # the write is committed: other workers' caches catch up when their entries expire
+                logger.error("Could not announce changed users %s: %s", list(changed), e)
+
+    async def close(self):
+        """Closes the session if this unit of work opened it."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+            self._users = self._pairing = None
 
-async def get_uow(session: AsyncSession = Depends(get_session)) -> AsyncIterator[UnitOfWork]:
+async def get_uow() -> AsyncIterator[UnitOfWork]:
     """
     Dependency provider for UnitOfWork.
 
     Yields:
-        UnitOfWork: An instance with an active session.
+        UnitOfWork: An instance whose session is opened lazily and closed after the request.
+    """
+    uow = UnitOfWork()
+    try:
+        yield uow
+    finally:
+        await uow.close()
+
+@asynccontextmanager
+async def uow_scope() -> AsyncIterator[UnitOfWork]:
+    """
+    Opens a short-lived UnitOfWork whose session is returned to the pool on exit.
+    For long-lived handlers (WebSockets) that only need the database briefly.
+
+    Yields:
+        UnitOfWork: An instance with a lazily opened session.
     """
-    uow = UnitOfWork(session)
+    uow = UnitOfWork()
     try:
         yield uow
     finally:
-        # Cleanup if necessary; Session will be closed by the dependency
-        ...
\ No newline at end of file
+        await uow.close()
+
+UowFactory = Callable[[], AsyncContextManager[UnitOfWork]]
+
+def get_uow_factory() -> UowFactory:
+    """
+    Dependency provider for a UnitOfWork factory (see uow_scope).
+
+    Returns:
+        UowFactory: Callable returning an async context manager yielding a UnitOfWork.
+    """
+    return uow_scope
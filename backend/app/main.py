@@ -1,28 +1,41 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import overlay, auth, me, public, pairing
-from app.core.redis_broker import RedisBroker
+from app.api.routes import overlay, auth, me, public, pairing, ingest
+from app.core.codec import BACKEND as codec_backend, FastJSONResponse
+from app.core.auth import require_metrics_access
+from app.core.broker import connect_broker
+from app.core.redis_broker import close_redis_client
+from app.core.jwt import token_cache
 from app.core.settings import settings
+from app.core.user_cache import duck_colors, handle_duck_update, handle_user_invalidation, user_cache
+from app.services.overlay import heartbeat, overlay_stats, room_listener
+from app.services.sweeper import pairing_sweeper
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("Application starting up...")
-    try:
-        await broker.connect()
-        app.state.redis_broker = broker
-    except Exception as e:
-        print(f"Error connecting to Redis broker: {e}")
+    broker = await connect_broker()
+    app.state.broker = broker
+    await room_listener.add_handler(broker, settings.REDIS_USERS_CHANNEL, handle_user_invalidation)
+    await room_listener.add_handler(broker, settings.REDIS_DUCKS_CHANNEL, handle_duck_update)
+
+    pairing_sweeper.start()
+    heartbeat.start()
 
     yield
 
     # Shutdown
     print("Application shutting down...")
+    await pairing_sweeper.stop()
+    await heartbeat.stop()
+    await room_listener.close()
+    app.state.broker = None
     await broker.close()
+    await close_redis_client()
 
-broker = RedisBroker(settings.REDIS_URL)
-app = FastAPI(title="QuackChat - Backend (Step 1)", lifespan=lifespan)
+app = FastAPI(title="QuackChat - Backend (Step 1)", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,11 +49,30 @@ app.add_middleware(
 async def health():
     return {"status": "ok"}
 
+@app.get("/metrics", dependencies=[Depends(require_metrics_access)])
+async def metrics():
+    """
+    Reports in-process counters for this worker (open outside prod, behind METRICS_API_KEY in prod).
+
+    Returns:
+        dict: Overlay rooms/listeners and heartbeat, cache hit/miss counters, pairing sweeper metrics and the JSON backend.
+    """
+    return {
+        "overlay": overlay_stats(),
+        "heartbeat": heartbeat.stats(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "duck_colors": duck_colors.stats(),
+        "pairing_sweeper": pairing_sweeper.stats(),
+        "json_codec": codec_backend,
+    }
+
 # Routes
 app.include_router(overlay.router)
 app.include_router(public.router)
 app.include_router(me.router)
 app.include_router(pairing.router)
+app.include_router(ingest.router)
 
 if settings.ENV != "prod":
     from app.api.routes import dev
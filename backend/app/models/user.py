@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, func
+from sqlalchemy import String, DateTime, Integer, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
@@ -11,6 +11,7 @@ class User(Base):
         id (str): Unique identifier for the user (e.g., "twitch:abcd").
         display (str): Display name of the user.
         duck_color (str): Color associated with the user's duck.
+        claims_version (int): Bumped on every identity change; tokens carrying an older value are stale.
         created_at (datetime): Timestamp when the user was created.
         updated_at (datetime): Timestamp when the user was last updated.
     """
@@ -19,6 +20,7 @@ class User(Base):
     id: Mapped[str] = mapped_column(String(64), primary_key=True)  # ex: "twitch:abcd"
     display: Mapped[str] = mapped_column(String(40), nullable=False)
     duck_color: Mapped[str] = mapped_column(String(7), nullable=False, default="#8A2BE2")
+    claims_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
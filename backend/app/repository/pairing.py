@@ -1,10 +1,14 @@
 from typing import Optional
 from datetime import datetime, timezone, timedelta
 import secrets
+import redis.asyncio as redis
 from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import codec
+from app.core.settings import settings
+from app.db.dialects import on_conflict_insert
 from app.models.pairing import PairingCode
-from app.repository.user import UsersRepository
 
 DEFAULT_TTL_S = 300  # Default time-to-live for pairing codes in seconds
 
@@ -12,9 +16,28 @@ def _now() -> datetime:
     """Returns the current UTC datetime."""
     return datetime.now(timezone.utc)
 
-def generate_code() -> str:
-    """Generates a random, readable pairing code."""
-    return secrets.token_hex(3).upper()
+# Crockford-style alphabet: no 0/O or 1/I to misread; 32 symbols = 5 bits per character
+CODE_ALPHABET = "23456789ABCDEFGHJKLMNPQRSTUVWXYZ"
+
+class CodeSpaceExhausted(RuntimeError):
+    """Raised when no free pairing code was found within the allowed attempts."""
+
+def generate_code(length: Optional[int] = None) -> str:
+    """
+    Generates a random, readable pairing code.
+
+    The default length (settings.PAIRING_CODE_LENGTH, 8 = 40 bits) keeps the chance that a new
+    code hits a live one below one in a million with a million live codes; callers still retry
+    on conflict.
+
+    Args:
+        length (Optional[int]): Number of characters.
+
+    Returns:
+        str: The pairing code.
+    """
+    n = settings.PAIRING_CODE_LENGTH if length is None else length
+    return "".join(secrets.choice(CODE_ALPHABET) for _ in range(n))
 
 class PairingRepository:
     """Repository for pairing code-related database operations."""
@@ -24,6 +47,8 @@ class PairingRepository:
     async def create(self, duck_color: str, channel: str, ttl_s: int = DEFAULT_TTL_S) -> PairingCode:
         """
         Creates and adds a new pairing code to the database.
+        Inserts with ON CONFLICT DO NOTHING (SQLite, PostgreSQL) or inside a savepoint elsewhere,
+        drawing a new code on conflict, so a collision never surfaces as an IntegrityError at commit.
 
         Args:
             duck_color (str): The duck color to pair.
@@ -32,15 +57,34 @@ class PairingRepository:
 
         Returns:
             PairingCode: The created pairing code object.
+
+        Raises:
+            CodeSpaceExhausted: If every attempt hit an existing code.
         """
-        rec = PairingCode(
-            code=generate_code(),
-            duck_color=duck_color,
-            channel=channel,
-            expires_at=_now() + timedelta(seconds=ttl_s),
-        )
-        self.session.add(rec)
-        return rec
+        insert = on_conflict_insert(self.session)
+        for _ in range(settings.PAIRING_CODE_MAX_ATTEMPTS):
+            values = dict(
+                code=generate_code(),
+                duck_color=duck_color,
+                channel=channel,
+                expires_at=_now() + timedelta(seconds=ttl_s),
+            )
+            if insert is not None:
+                res = await self.session.execute(
+                    insert(PairingCode).values(**values).on_conflict_do_nothing().returning(PairingCode)
+                )
+                rec = res.scalar_one_or_none()
+                if rec is not None:
+                    return rec
+                continue
+            rec = PairingCode(**values)
+            try:
+                async with self.session.begin_nested():
+                    self.session.add(rec)
+                return rec
+            except IntegrityError:
+                continue
+        raise CodeSpaceExhausted("Could not allocate a unique pairing code")
 
     async def get(self, code: str) -> Optional[PairingCode]:
         """
@@ -62,4 +106,157 @@ class PairingRepository:
         Args:
             code (str): The pairing code to delete.
         """
-        await self.session.execute(delete(PairingCode).where(PairingCode.code == code))
\ No newline at end of file
+        await self.session.execute(delete(PairingCode).where(PairingCode.code == code))
+
+    async def claim(self, code: str, channel: str) -> Optional[PairingCode]:
+        """
+        Atomically consumes a valid, unexpired code for the given channel.
+        A single DELETE ... RETURNING: of several concurrent claimers, exactly one gets the row.
+
+        Args:
+            code (str): The pairing code to claim.
+            channel (str): The overlay channel the code must belong to.
+
+        Returns:
+            Optional[PairingCode]: The consumed pairing code, or None if it was missing,
+            expired, bound to another channel or already claimed.
+        """
+        res = await self.session.execute(
+            delete(PairingCode)
+            .where(
+                PairingCode.code == code,
+                PairingCode.channel == channel,
+                PairingCode.expires_at > _now(),
+            )
+            .returning(PairingCode)
+        )
+        return res.scalar_one_or_none()
+
+    async def delete_expired(self, limit: int) -> int:
+        """
+        Deletes up to `limit` expired codes, oldest first (walks ix_pairing_expires_at).
+
+        Args:
+            limit (int): Maximum number of rows to delete.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        oldest = (
+            select(PairingCode.code)
+            .where(PairingCode.expires_at <= _now())
+            .order_by(PairingCode.expires_at)
+            .limit(limit)
+        )
+        res = await self.session.execute(
+            delete(PairingCode).where(PairingCode.code.in_(oldest)),
+            execution_options={"synchronize_session": False},
+        )
+        return res.rowcount
+
+# Atomic claim: returns and deletes the record only if it belongs to the requested channel
+_CLAIM_SCRIPT = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then return false end
+if cjson.decode(raw)['channel'] ~= ARGV[1] then return false end
+redis.call('DEL', KEYS[1])
+return raw
+"""
+
+class RedisPairingRepository:
+    """
+    Pairing code repository backed by Redis keys with native TTLs.
+
+    Same interface as PairingRepository, but writes are applied immediately (there is no
+    transaction to commit) and expired codes simply vanish, so no sweep is needed.
+    An expired code therefore reads as missing rather than expired.
+    """
+    def __init__(self, client: redis.Redis, prefix: Optional[str] = None):
+        self.client = client
+        self.prefix = settings.REDIS_PAIRING_PREFIX if prefix is None else prefix
+
+    def _key(self, code: str) -> str:
+        return f"{self.prefix}:{code}"
+
+    @staticmethod
+    def _load(code: str, raw: Optional[str]) -> Optional[PairingCode]:
+        if not raw:
+            return None
+        data = codec.loads(raw)
+        return PairingCode(
+            code=code,
+            duck_color=data["duck_color"],
+            channel=data["channel"],
+            created_at=datetime.fromisoformat(data["created_at"]),
+            expires_at=datetime.fromisoformat(data["expires_at"]),
+        )
+
+    async def create(self, duck_color: str, channel: str, ttl_s: int = DEFAULT_TTL_S) -> PairingCode:
+        """
+        Stores a new pairing code under a key that expires after `ttl_s` seconds.
+        Uses SET ... EX ... NX and draws a new code if the key is already taken.
+
+        Args:
+            duck_color (str): The duck color to pair.
+            channel (str): The overlay channel.
+            ttl_s (int): Time-to-live in seconds (default: 300).
+
+        Returns:
+            PairingCode: The created pairing code object (not attached to any session).
+
+        Raises:
+            CodeSpaceExhausted: If every attempt hit an existing code.
+        """
+        now = _now()
+        expires_at = now + timedelta(seconds=ttl_s)
+        value = codec.dumps({
+            "duck_color": duck_color,
+            "channel": channel,
+            "created_at": now.isoformat(),
+            "expires_at": expires_at.isoformat(),
+        })
+        for _ in range(settings.PAIRING_CODE_MAX_ATTEMPTS):
+            code = generate_code()
+            if await self.client.set(self._key(code), value, ex=ttl_s, nx=True):
+                return PairingCode(code=code, duck_color=duck_color, channel=channel,
+                                   created_at=now, expires_at=expires_at)
+        raise CodeSpaceExhausted("Could not allocate a unique pairing code")
+
+    async def get(self, code: str) -> Optional[PairingCode]:
+        """
+        Retrieves a live pairing code.
+
+        Args:
+            code (str): The pairing code to look up.
+
+        Returns:
+            Optional[PairingCode]: The pairing code object if found and not expired, else None.
+        """
+        return self._load(code, await self.client.get(self._key(code)))
+
+    async def delete(self, code: str) -> None:
+        """
+        Deletes a pairing code.
+
+        Args:
+            code (str): The pairing code to delete.
+        """
+        await self.client.delete(self._key(code))
+
+    async def claim(self, code: str, channel: str) -> Optional[PairingCode]:
+        """
+        Atomically gets and deletes a live code for the given channel (server-side script).
+
+        Args:
+            code (str): The pairing code to claim.
+            channel (str): The overlay channel the code must belong to.
+
+        Returns:
+            Optional[PairingCode]: The consumed pairing code, or None.
+        """
+        raw = await self.client.eval(_CLAIM_SCRIPT, 1, self._key(code), channel)
+        return self._load(code, raw)
+
+    async def delete_expired(self, limit: int) -> int:
+        """Expired keys are evicted by Redis itself; nothing to sweep."""
+        return 0
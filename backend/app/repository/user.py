@@ -1,15 +1,28 @@
-from typing import Any, Optional
-from sqlalchemy import select, update
+from typing import Any, Dict, Iterable, Optional
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.dialects import on_conflict_insert
 from app.models.user import User
+from app.core.user_cache import user_cache, snapshot
 
 DEFAULT_COLOR = "#8A2BE2"
 ALLOWED_PATCH = {"display", "duck_color"}
 
 class UsersRepository:
-    """Repository for user-related database operations."""
+    """
+    Repository for user-related database operations.
+
+    Writes bump the user's claims_version, evict it from the shared user cache and are
+    recorded in `changed` (id -> new version) so the unit of work can notify other
+    workers once the transaction commits.
+    """
     def __init__(self, session: AsyncSession):
         self.session = session
+        self.changed: dict[str, int] = {}
+
+    def _touch(self, user: User) -> None:
+        user_cache.pop(user.id)
+        self.changed[user.id] = user.claims_version
 
     async def get(self, user_id: str) -> Optional[User]:
         """
@@ -26,7 +39,51 @@ class UsersRepository:
             .where(User.id == user_id)
         )
         return res.scalar_one_or_none()
-    
+
+    async def get_cached(self, user_id: str) -> Optional[User]:
+        """
+        Retrieves a user through the in-process user cache, loading it on a miss.
+        The returned object may be a detached snapshot: read it, do not modify it.
+
+        Args:
+            user_id (str): The user's unique identifier.
+
+        Returns:
+            Optional[User]: The user object if found, else None.
+        """
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            return cached
+        user = await self.get(user_id)
+        if user is not None:
+            user_cache.set(user_id, snapshot(user))
+        return user
+
+    async def get_colors(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Resolves the duck color of many users at once: cached users are served from the
+        user cache (peeked, so its hit/miss counters only reflect authentication), the others are loaded with a single SELECT. Unknown users are omitted.
+        Chat enrichment goes through duck_colors.get_many, which calls this only for its misses.
+
+        Args:
+            user_ids (Iterable[str]): User identifiers (duplicates allowed).
+
+        Returns:
+            Dict[str, str]: user id -> duck color.
+        """
+        colors: Dict[str, str] = {}
+        missing = []
+        for uid in set(user_ids):
+            cached = user_cache.peek(uid)
+            if cached is not None:
+                colors[uid] = cached.duck_color
+            else:
+                missing.append(uid)
+        if missing:
+            res = await self.session.execute(select(User.id, User.duck_color).where(User.id.in_(missing)))
+            colors.update(res.all())
+        return colors
+
     async def create(self, uid: str, display: str, duck_color: str) -> User:
         """
         Adds a new user to the database.
@@ -39,8 +96,43 @@ class UsersRepository:
         Returns:
             User: The created user object.
         """
-        user = User(id=uid, display=display, duck_color=duck_color)
+        user = User(id=uid, display=display, duck_color=duck_color, claims_version=0)
         self.session.add(user)
+        self._touch(user)
+        return user
+
+    async def upsert_color(self, user_id: str, duck_color: str) -> User:
+        """
+        Sets a user's duck color, creating the user (display = id) if missing, in one statement.
+        Uses INSERT ... ON CONFLICT DO UPDATE ... RETURNING on SQLite and PostgreSQL.
+
+        Args:
+            user_id (str): The user's unique identifier.
+            duck_color (str): The duck color to apply.
+
+        Returns:
+            User: The created or updated user object.
+        """
+        insert = on_conflict_insert(self.session)
+        if insert is None:
+            user = await self.get(user_id)
+            if user is None:
+                return await self.create(user_id, display=user_id, duck_color=duck_color)
+            return await self.patch(user_id, {"duck_color": duck_color})
+        stmt = insert(User).values(
+            id=user_id, display=user_id, duck_color=duck_color, claims_version=0
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.id],
+            set_={
+                "duck_color": stmt.excluded.duck_color,
+                "claims_version": User.claims_version + 1,
+                "updated_at": func.now(),
+            },
+        ).returning(User)
+        res = await self.session.execute(stmt, execution_options={"populate_existing": True})
+        user = res.scalar_one()
+        self._touch(user)
         return user
 
     async def ensure_for_login(self, user_id: str, display: str, *, default_color: str = DEFAULT_COLOR) -> User:
@@ -62,18 +154,20 @@ class UsersRepository:
                 await self.session.execute(
                     update(User)
                     .where(User.id == user_id)
-                    .values(display=display)
+                    .values(display=display, claims_version=User.claims_version + 1)
                 )
-                user.display = display
+                user.display = display  # claims_version is synchronized by the ORM-enabled UPDATE
+                self._touch(user)
             return user
-        user = User(id=user_id, display=display, duck_color=default_color)
+        user = User(id=user_id, display=display, duck_color=default_color, claims_version=0)
         self.session.add(user)
+        self._touch(user)  # drops a cached "unknown user" color once committed
         return user
 
     async def patch(self, user_id: str, changes: dict[str, Any]) -> User:
         """
         Applies a whitelist patch to the user (only 'display' and 'duck_color').
-        Returns the updated user object.
+        Issues a single UPDATE ... RETURNING (no prior SELECT) and returns the updated user object.
 
         Args:
             user_id (str): The user's unique identifier.
@@ -85,10 +179,21 @@ class UsersRepository:
         Raises:
             ValueError: If the user is not found.
         """
-        user = await self.get(user_id)
+        values = {k: v for k, v in changes.items() if k in ALLOWED_PATCH}
+        if not values:
+            user = await self.get(user_id)
+            if user is None:
+                raise ValueError("User not found")
+            return user
+        res = await self.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values, claims_version=User.claims_version + 1)
+            .returning(User),
+            execution_options={"populate_existing": True},
+        )
+        user = res.scalar_one_or_none()
         if user is None:
             raise ValueError("User not found")
-        for k, v in changes.items():
-            if k in ALLOWED_PATCH:
-                setattr(user, k, v)
+        self._touch(user)
         return user
\ No newline at end of file
@@ -18,4 +18,17 @@ class DuckUpdateEvent(BaseModel):
     duck: DuckPayload
     v: int = 1
 
-WSEvent = Union[ChatEvent, DuckUpdateEvent]
\ No newline at end of file
+class PairingClaimedEvent(BaseModel):
+    """WebSocket event telling a waiting guest that their pairing code was claimed."""
+    type: Literal["pairing_claimed"]
+    code: str
+    duck: DuckPayload
+    v: int = 1
+
+class PairingExpiredEvent(BaseModel):
+    """WebSocket event telling a waiting guest that their pairing code expired unclaimed."""
+    type: Literal["pairing_expired"]
+    code: str
+    v: int = 1
+
+WSEvent = Union[ChatEvent, DuckUpdateEvent, PairingClaimedEvent, PairingExpiredEvent]
\ No newline at end of file
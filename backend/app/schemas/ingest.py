@@ -0,0 +1,14 @@
+from typing import List
+from pydantic import BaseModel, Field
+from app.core.settings import settings
+
+class ChatIngestItem(BaseModel):
+    """One chat message relayed by a chat bridge."""
+    user_id: str = Field(min_length=1, description='Sender id, e.g. "twitch:<id>"')
+    display: str = Field(min_length=1, max_length=64)
+    message: str = Field(min_length=1, max_length=500)
+
+class ChatBatch(BaseModel):
+    """Batch of chat messages for one overlay room."""
+    channel: str = Field(min_length=1, description='Overlay room, e.g. "user:twitch:42"')
+    messages: List[ChatIngestItem] = Field(max_length=settings.INGEST_MAX_BATCH)
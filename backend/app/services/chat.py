@@ -0,0 +1,29 @@
+from typing import Sequence
+from app.core.user_cache import duck_colors
+from app.db.uow import UnitOfWork
+from app.repository.user import DEFAULT_COLOR
+from app.schemas.ingest import ChatIngestItem
+from app.services.overlay import chat_payload, send_events
+
+async def ingest_chat(uow: UnitOfWork, channel: str, messages: Sequence[ChatIngestItem]) -> int:
+    """
+    Pushes a batch of chat messages to an overlay room.
+    Sender colors come from the duck color cache, its misses filled with a single query;
+    senders without an account get the default color. The events are then published in one burst.
+
+    Args:
+        uow (UnitOfWork): Unit of Work instance (read-only here).
+        channel (str): Overlay room receiving the messages.
+        messages (Sequence[ChatIngestItem]): Messages in chat order.
+
+    Returns:
+        int: Number of messages sent.
+    """
+    if not messages:
+        return 0
+    colors = await duck_colors.get_many((m.user_id for m in messages), uow.users.get_colors)
+    await send_events(channel, [
+        chat_payload(m.display, m.message, m.user_id, colors.get(m.user_id, DEFAULT_COLOR))
+        for m in messages
+    ])
+    return len(messages)
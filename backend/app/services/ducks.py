@@ -1,9 +1,10 @@
-from typing import Any, Dict, Mapping, Set, Callable, Tuple
+from typing import Any, Dict, Mapping, Optional, Set, Callable, Tuple
 from fastapi import HTTPException
 from app.core.state import PALETTE
 from app.db.uow import UnitOfWork
+from app.models.user import User
 from app.schemas.duck import DuckOut
-from app.services.overlay import send_event, make_duck_update_event
+from app.services.overlay import send_event, duck_update_payload
 from starlette import status
 
 # Editable fields on the client side
@@ -81,18 +82,23 @@ async def apply_duck_patch(
         uow: UnitOfWork,
         uid: str,
         patch: Mapping[str, Any], *,
-        channel: str = "default"
+        channel: str = "default",
+        user: Optional[User] = None
         ) -> Tuple[dict, dict]:
     """
     Applies a duck patch (currently: duck_color).
     All-or-nothing: writes to the DB only if all validations pass.
     Returns (duck_dict, changed_fields).
 
+    When the caller already loaded the user for this request, pass it as `user`:
+    the patch then costs a single UPDATE ... RETURNING and no SELECT.
+
     Args:
         uow (UnitOfWork): The unit of work for DB operations.
         uid (str): The user identifier.
         patch (Mapping[str, Any]): The patch data to apply.
         channel (str, optional): Overlay channel name.
+        user (Optional[User]): The user already loaded for this request, if any.
 
     Returns:
         Tuple[dict, dict]: The updated duck data and the changed fields.
@@ -100,7 +106,8 @@ async def apply_duck_patch(
     Raises:
         HTTPException: If the user is not found or validation fails.
     """
-    user = await uow.users.get(uid)
+    if user is None or user.id != uid:
+        user = await uow.users.get(uid)
     if user is None:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found")
 
@@ -113,9 +120,13 @@ async def apply_duck_patch(
     # Phase 2: apply only actual changes
     changed = {k: v for k, v in clean.items() if getattr(user, k) != v}
     if changed:
-        user = await uow.users.patch(uid, changed)
-        if "duck_color" in changed:
-            await send_event(channel, make_duck_update_event(uid, changed["duck_color"]))
+        try:
+            user = await uow.users.patch(uid, changed)
+        except ValueError:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "User not found")
 
     await uow.commit()
+    # Only announce stored colors: the event also refreshes every worker's color cache
+    if "duck_color" in changed:
+        await send_event(channel, duck_update_payload(uid, changed["duck_color"]))
     return DuckOut(duck_color=user.duck_color).model_dump(), changed
\ No newline at end of file
@@ -1,31 +1,154 @@
 import asyncio
+import logging
 from collections.abc import Mapping
-from typing import Union, Dict, Any, Set, DefaultDict
-import json
-from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple, Union
 from fastapi import WebSocket
+from app.core import codec
+from app.core.user_cache import duck_colors
+from app.services import wire
 from pydantic import BaseModel
+from app.core.settings import settings
 from app.schemas.duck import DuckOut
 from app.schemas.events import ChatEvent, DuckUpdateEvent, WSEvent
 
+logger = logging.getLogger(__name__)
+
+
+# An event already serialized for the wire: JSON text, or bytes from a raw broker payload
+Frame = Union[str, bytes]
+
+def encode_frame(payload: Mapping[str, Any]) -> str:
+    """
+    Serializes an event payload into a wire frame.
+
+    Args:
+        payload (Mapping[str, Any]): Event data.
+
+    Returns:
+        str: Compact JSON text.
+    """
+    return codec.dumps(payload)
+
+def decode_frame(frame: Frame) -> Dict[str, Any]:
+    """
+    Parses a wire frame back into an event payload, for consumers that need the dict.
+
+    Args:
+        frame (Frame): JSON text or bytes.
+
+    Returns:
+        Dict[str, Any]: The decoded event.
+    """
+    return codec.loads(frame)
+
+
+class _Peer:
+    """
+    Outbound side of one overlay WebSocket: a bounded frame queue drained by a dedicated writer task.
+
+    Attributes:
+        ws (WebSocket): Client WebSocket connection.
+        channel (str): Room the socket belongs to.
+        fmt (str): Wire format negotiated by the socket (see app.services.wire).
+        deflate (bool): Whether the socket receives raw-deflate compressed frames.
+        answers (bool): Whether the socket ever sent anything back (i.e. it answers heartbeats).
+        missed (int): Heartbeats sent since the socket last sent something.
+        queue (asyncio.Queue): Frames waiting to be sent.
+        dropped (int): Frames dropped since the last successful send.
+        task (asyncio.Task | None): Writer task draining the queue.
+        on_sent (Callable[[Frame], None] | None): Called with each frame once it was sent.
+    """
+    __slots__ = ("ws", "channel", "fmt", "deflate", "answers", "missed", "queue", "dropped", "task", "on_sent")
+
+    def __init__(self, ws: WebSocket, channel: str, maxsize: int,
+                 fmt: str = wire.DEFAULT_FORMAT, deflate: bool = False,
+                 on_sent: Optional[Callable[[Frame], None]] = None):
+        self.ws = ws
+        self.channel = channel
+        self.fmt = fmt
+        self.deflate = deflate
+        self.answers = False
+        self.missed = 0
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.task: Optional[asyncio.Task] = None
+        self.on_sent = on_sent
+
+    def offer(self, frame: Frame) -> bool:
+        """
+        Enqueues a frame without blocking; drops the oldest frame when the queue is full.
+
+        Args:
+            frame (Frame): Encoded frame to send (text or binary).
+
+        Returns:
+            bool: False if the socket exceeded the dropped-frames budget and should be disconnected.
+        """
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            pass
+        self.queue.get_nowait()  # drop oldest
+        self.queue.put_nowait(frame)
+        self.dropped += 1
+        limit = settings.OVERLAY_MAX_DROPPED_FRAMES
+        return not (limit and self.dropped >= limit)
+
+
+class _FrameSet:
+    """
+    One event, encoded lazily once per (wire format, deflate) pair present among the
+    recipients; every socket asking for the same pair gets the same object.
+    """
+    __slots__ = ("payload", "frames")
+
+    def __init__(self, payload: Union[Mapping[str, Any], Frame]):
+        frame = payload if isinstance(payload, (str, bytes)) else encode_frame(payload)
+        self.payload = payload
+        self.frames: Dict[Tuple[str, bool], Frame] = {(wire.DEFAULT_FORMAT, False): frame}
+
+    def for_peer(self, peer: "_Peer") -> Frame:
+        out = self.frames.get((peer.fmt, peer.deflate))
+        if out is None:
+            out = self.frames.get((peer.fmt, False))
+            if out is None:
+                if isinstance(self.payload, (str, bytes)):
+                    self.payload = decode_frame(self.payload)
+                out = self.frames[(peer.fmt, False)] = wire.encode(self.payload, peer.fmt)
+            if peer.deflate:
+                out = self.frames[(peer.fmt, True)] = wire.deflate(out)
+        return out
+
 
 class Rooms:
     """
     Manages WebSocket rooms for overlay channels.
+
+    Each socket owns a bounded outbound queue and a writer task, so broadcasting is a
+    non-blocking enqueue and a slow overlay only delays itself. Empty rooms are dropped.
     """
     def __init__(self):
-        self.rooms: DefaultDict[str, Set[WebSocket]] = defaultdict(set)
+        self.rooms: Dict[str, Dict[WebSocket, _Peer]] = {}
 
-    async def add(self, ws: WebSocket, channel: str):
+    async def add(self, ws: WebSocket, channel: str, fmt: str = wire.DEFAULT_FORMAT,
+                  subprotocol: Optional[str] = None, deflate: bool = False,
+                  on_sent: Optional[Callable[[Frame], None]] = None):
         """
         Accepts a WebSocket connection and adds it to the specified channel.
 
         Args:
             ws (WebSocket): Client WebSocket connection.
             channel (str): Channel name.
+            fmt (str): Wire format the socket receives frames in (default: JSON text).
+            subprotocol (str | None): Negotiated subprotocol to confirm in the handshake.
+            deflate (bool): Send frames compressed with wire.deflate (shared across the room).
+            on_sent (Callable[[Frame], None] | None): Called by the writer task after each frame it sent.
         """
-        await ws.accept()
-        self.rooms[channel].add(ws)
+        await ws.accept(subprotocol=subprotocol)
+        peer = _Peer(ws, channel, settings.OVERLAY_SEND_QUEUE_SIZE, fmt, deflate, on_sent)
+        peer.task = asyncio.create_task(self._writer(peer))
+        self.rooms.setdefault(channel, {})[ws] = peer
 
     async def remove(self, ws: WebSocket, channel: str):
         """
@@ -35,26 +158,193 @@ class Rooms:
             ws (WebSocket): Client WebSocket connection.
             channel (str): Channel name.
         """
-        self.rooms[channel].discard(ws)
+        members = self.rooms.get(channel)
+        if members is None:
+            return
+        peer = members.pop(ws, None)
+        if not members:
+            del self.rooms[channel]
+        if peer and peer.task and peer.task is not asyncio.current_task():
+            peer.task.cancel()
 
-    async def broadcast(self, channel: str, payload: Dict[str, Any]):
+    async def broadcast(self, channel: str, payload: Union[Mapping[str, Any], Frame]):
         """
         Broadcasts a message to all clients connected to the given channel.
+        The payload is encoded, and compressed if needed, once per wire format present in the
+        room (pre-encoded JSON frames go to JSON sockets as is), then the same frame is enqueued on
+        every socket of that format; this never waits on the network.
 
         Args:
             channel (str): Channel name.
-            payload (Dict[str, Any]): Data to send.
+            payload (Mapping[str, Any] | Frame): Data to send, or an already encoded JSON frame.
         """
-        txt = json.dumps(payload)
-        for ws in list(self.rooms[channel]):  # snapshot to allow removal during iteration
+        members = self.rooms.get(channel)
+        if not members:
+            return
+        frames = _FrameSet(payload)
+        failed: Set[Tuple[str, bool]] = set()
+        for ws, peer in list(members.items()):  # snapshot to allow removal during iteration
+            if (peer.fmt, peer.deflate) in failed:
+                continue
             try:
-                await ws.send_text(txt)
-            except Exception:
-                self.rooms[channel].discard(ws)
+                frame = frames.for_peer(peer)
+            except Exception as e:
+                # non-JSON frame, or an event missing a field of its layout: only this format misses it
+                failed.add((peer.fmt, peer.deflate))
+                logger.error("Overlay frame for %s could not be encoded as %s: %r", channel, peer.fmt, e)
+                continue
+            if not peer.offer(frame):
+                await self._disconnect(peer)
+
+    def touch(self, ws: WebSocket, channel: str):
+        """
+        Records that a socket sent something (a pong or any message): it is alive and
+        answers heartbeats, so from now on it gets reaped if it stops answering.
+
+        Args:
+            ws (WebSocket): Client WebSocket connection.
+            channel (str): Channel name.
+        """
+        peer = self.rooms.get(channel, {}).get(ws)
+        if peer is not None:
+            peer.answers = True
+            peer.missed = 0
+
+    async def _writer(self, peer: _Peer):
+        """Drains a socket's queue; removes the socket from its room on the first send failure."""
+        try:
+            while True:
+                frame = await peer.queue.get()
+                if isinstance(frame, bytes):
+                    await peer.ws.send_bytes(frame)
+                else:
+                    await peer.ws.send_text(frame)
+                peer.dropped = 0
+                if peer.on_sent is not None:
+                    peer.on_sent(frame)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            await self.remove(peer.ws, peer.channel)
+
+    async def _disconnect(self, peer: _Peer, code: int = 1008, reason: str = "Too slow"):
+        """Drops a socket (by default one that fell too far behind) and closes it."""
+        await self.remove(peer.ws, peer.channel)
+        try:
+            await peer.ws.close(code=code, reason=reason)
+        except Exception:
+            pass
 
 # Simple singleton instance
 rooms = Rooms()
 
+
+class Heartbeat:
+    """
+    Pings every overlay socket from one shared timer (no task per socket) and reaps the dead.
+
+    Each tick enqueues a {"type": "ping"} event on every socket, encoded once per wire format.
+    Clients answer with any message (e.g. "pong"). A socket that has answered before and then
+    stays silent for `max_missed` ticks is closed with 4408. Sockets that never answered
+    (current overlays) are only reaped that way with `reap_silent`, to be enabled once every
+    shipped overlay answers: a write to a half-open TCP connection does not fail until the
+    kernel gives up retransmitting, minutes later. Until then, dead connections are caught by
+    the server's protocol-level ping/pong (uvicorn --ws-ping-interval / --ws-ping-timeout,
+    answered by browsers on their own); the handlers count them in `lost`.
+
+    Attributes:
+        interval (float): Seconds between two ticks.
+        max_missed (int): Unanswered pings before a socket is reaped.
+        reap_silent (bool): Also reap sockets that never answered a ping.
+        pings (int): Pings enqueued.
+        reaped (int): Sockets closed for missing pongs.
+        lost (int): Sockets gone without a close handshake (code 1006, e.g. a protocol ping timeout).
+    """
+    PING = {"type": "ping", "v": 1}
+
+    def __init__(self, rooms: Rooms, interval: Optional[float] = None, max_missed: Optional[int] = None,
+                 reap_silent: Optional[bool] = None):
+        self.rooms = rooms
+        self.interval = settings.OVERLAY_HEARTBEAT_SECONDS if interval is None else interval
+        self.max_missed = settings.OVERLAY_HEARTBEAT_MAX_MISSED if max_missed is None else max_missed
+        self.reap_silent = settings.OVERLAY_HEARTBEAT_REAP_SILENT if reap_silent is None else reap_silent
+        self.pings = 0
+        self.reaped = 0
+        self.lost = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def tick(self) -> int:
+        """
+        Reaps the sockets that stopped answering and pings all the others.
+
+        Returns:
+            int: Sockets reaped by this tick.
+        """
+        frames = _FrameSet(self.PING)
+        reaped = 0
+        for members in list(self.rooms.rooms.values()):
+            for peer in list(members.values()):
+                if (peer.answers or self.reap_silent) and peer.missed >= self.max_missed:
+                    await self.rooms._disconnect(peer, code=4408, reason="Heartbeat timeout")
+                    reaped += 1
+                    continue
+                peer.missed += 1
+                self.pings += 1
+                if not peer.offer(frames.for_peer(peer)):
+                    await self.rooms._disconnect(peer)
+            await asyncio.sleep(0)  # yield between rooms
+        self.reaped += reaped
+        return reaped
+
+    def disconnected(self, code: int):
+        """
+        Records how a socket went away; abnormal closures (1006) count as lost connections.
+
+        Args:
+            code (int): Close code reported by the server (WebSocketDisconnect.code).
+        """
+        if code == 1006:
+            self.lost += 1
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Overlay heartbeat failed: %s", e)
+
+    def start(self):
+        """Starts the shared timer (no-op if already running or disabled with interval <= 0)."""
+        if self.interval <= 0 or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancels the timer and waits for it to finish."""
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns heartbeat counters.
+
+        Returns:
+            Dict[str, int]: Pings sent, sockets reaped or lost, and sockets currently answering heartbeats.
+        """
+        return {
+            "pings": self.pings,
+            "reaped": self.reaped,
+            "lost": self.lost,
+            "answering": sum(p.answers for m in self.rooms.rooms.values() for p in m.values()),
+        }
+
+heartbeat = Heartbeat(rooms)
+
 EventLike = Union[WSEvent, Mapping[str, Any]]
 
 def _as_payload(event: EventLike) -> Dict:
@@ -70,32 +360,53 @@ def _as_payload(event: EventLike) -> Dict:
     Raises:
         TypeError: If the event type is unsupported.
     """
+    if type(event) is dict:  # fast-path payloads are already plain dicts
+        return event
     if isinstance(event, BaseModel):
         return event.model_dump()
     elif isinstance(event, Mapping):
         return dict(event)
     raise TypeError(f"Unsupported event type: {type(event)!r}")
 
+def encode_event(event: EventLike) -> Frame:
+    """
+    Encodes an event into a wire frame, e.g. to send it to a single socket.
+
+    Args:
+        event (EventLike): The event to encode.
+
+    Returns:
+        Frame: The encoded frame.
+    """
+    return encode_frame(_as_payload(event))
+
 def _get_broker():
     from app.main import app
-    return getattr(app.state, "redis_broker", None)
+    return getattr(app.state, "broker", None)
 
 async def send_event(channel: str, event: EventLike):
     """
     Broadcasts an arbitrary event on the overlay channel.
     
-    Uses Redis broker if available, otherwise broadcasts directly to WebSocket rooms.
+    Publishes through the broker if one is configured, otherwise broadcasts directly to WebSocket rooms.
+    The event is encoded exactly once; listeners forward the same frame to the sockets.
 
     Args:
         channel (str): Overlay channel name.
         event (EventLike): Event to broadcast (formatted for the overlay).
     """
     payload = _as_payload(event)
+    frame = encode_frame(payload)
     broker = _get_broker()
+    if payload.get("type") == "duck_update":
+        # keep every process's chat enrichment cache current, whatever room it serves
+        duck_colors.observe(payload)
+        if broker:
+            await broker.publish(settings.REDIS_DUCKS_CHANNEL, frame)
     if broker:
-        await broker.publish(overlay_channel_name(channel), payload)
+        await broker.publish(overlay_channel_name(channel), frame)
     else:
-        await rooms.broadcast(channel, payload)
+        await rooms.broadcast(channel, frame)
 
 def make_chat_event(display: str, 
                     message: str, 
@@ -138,6 +449,64 @@ def make_duck_update_event(user_id: str | int, duck_color: str) -> DuckUpdateEve
         duck=DuckOut(duck_color=duck_color)
     )
 
+async def send_events(channel: str, events: Iterable[EventLike]):
+    """
+    Broadcasts several events on the overlay channel, in order.
+    With a broker, all frames are published in one pipelined round trip; duck_update events
+    also refresh the duck color caches, as with send_event.
+
+    Args:
+        channel (str): Overlay channel name.
+        events (Iterable[EventLike]): Events to broadcast.
+    """
+    payloads = [_as_payload(event) for event in events]
+    if not payloads:
+        return
+    frames = [encode_frame(payload) for payload in payloads]
+    ducks = [f for p, f in zip(payloads, frames) if p.get("type") == "duck_update"]
+    for payload in payloads:
+        duck_colors.observe(payload)  # ignores other event types
+    broker = _get_broker()
+    if broker and ducks:
+        await broker.publish_many(settings.REDIS_DUCKS_CHANNEL, ducks)
+    if broker:
+        await broker.publish_many(overlay_channel_name(channel), frames)
+    else:
+        for frame in frames:
+            await rooms.broadcast(channel, frame)
+
+# Fast paths for the hot events: build the plain dict that model_dump() would return, skipping
+# the model instances. tests/test_overlay.py checks them against ChatEvent / DuckUpdateEvent.
+
+def chat_payload(display: str, message: str, user_id: str | int, duck_color: str = "#8A2BE2") -> Dict[str, Any]:
+    """
+    Builds a chat event payload without instantiating ChatEvent.
+
+    Args:
+        display (str): User display name.
+        message (str): Message to display.
+        user_id (str | int): User identifier.
+        duck_color (str): Duck color.
+
+    Returns:
+        Dict[str, Any]: Same content as make_chat_event(...).model_dump().
+    """
+    return {"type": "chat", "user_id": str(user_id), "display": display, "message": message,
+            "duck": {"duck_color": duck_color}, "v": 1}
+
+def duck_update_payload(user_id: str | int, duck_color: str) -> Dict[str, Any]:
+    """
+    Builds a duck update event payload without instantiating DuckUpdateEvent.
+
+    Args:
+        user_id (str | int): User identifier.
+        duck_color (str): New duck color.
+
+    Returns:
+        Dict[str, Any]: Same content as make_duck_update_event(...).model_dump().
+    """
+    return {"type": "duck_update", "user_id": str(user_id), "duck": {"duck_color": duck_color}, "v": 1}
+
 def overlay_channel_name(room: str) -> str:
     """
     Generates the full overlay channel name.
@@ -148,30 +517,235 @@ def overlay_channel_name(room: str) -> str:
     Returns:
         str: Full channel name with prefix.
     """
-    from app.core.settings import settings
     return f"{settings.REDIS_OVERLAY_PREFIX}:{room}"
 
-_room_listeners: Dict[str, asyncio.Task] = {}
+class RoomListener:
+    """
+    Routes broker messages to rooms through one multiplexed subscription per process.
+
+    Rooms are reference-counted: each `watch` must be paired with a `release`. A flusher
+    task applies pending subscribe/unsubscribe calls in batches, and a reader task
+    dispatches each message to the room named by its channel. Teardown after the last
+    release is delayed by `linger` seconds so quick reconnects keep the subscription.
+    """
+    def __init__(self, rooms: Rooms, batch_window: float = 0.01, linger: Optional[float] = None):
+        self.rooms = rooms
+        self.batch_window = batch_window
+        self.linger = settings.OVERLAY_ROOM_LINGER_SECONDS if linger is None else linger
+        self._broker = None
+        self._subscription = None
+        self._wanted: Dict[str, str] = {}       # broker channel -> room
+        self._handlers: Dict[str, Callable[[Frame], Awaitable[Any]]] = {}  # broker channel -> callback
+        self._refs: Dict[str, int] = {}         # room -> live watchers
+        self._teardowns: Dict[str, asyncio.TimerHandle] = {}
+        self._subscribed: Set[str] = set()      # broker channels live on the subscription
+        self._dirty = asyncio.Event()
+        self._flushed: Optional[asyncio.Future] = None  # resolved when the next flush is applied
+        self._tasks: list[asyncio.Task] = []
+
+    async def watch(self, broker, room: str, timeout: float = 1.0):
+        """
+        Registers a room so its broker channel gets subscribed on the next flush, and waits
+        (up to `timeout` seconds) for that flush, so events published once this returns reach the room.
+
+        Args:
+            broker: Broker to subscribe through.
+            room (str): Room name.
+            timeout (float): Max wait for the subscription; the room stays registered either way.
+        """
+        self._broker = broker
+        self._refs[room] = self._refs.get(room, 0) + 1
+        pending = self._teardowns.pop(room, None)
+        if pending is not None:
+            pending.cancel()
+        channel = overlay_channel_name(room)
+        if channel not in self._wanted:
+            self._wanted[channel] = room
+            self._dirty.set()
+        self._ensure_running()
+        if channel not in self._subscribed:
+            if self._flushed is None:
+                self._flushed = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._flushed), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def add_handler(self, broker, channel: str, handler: Callable[[Frame], Awaitable[Any]]):
+        """
+        Routes a non-room broker channel (e.g. cache invalidations) to a callback,
+        over the same shared subscription.
+
+        Args:
+            broker: Broker to subscribe through.
+            channel (str): Full broker channel name.
+            handler (Callable[[Frame], Awaitable[Any]]): Called with each raw payload.
+        """
+        self._broker = broker
+        self._handlers[channel] = handler
+        self._dirty.set()
+        self._ensure_running()
+
+    def release(self, room: str):
+        """
+        Drops one reference to a room; the last one schedules a debounced unsubscribe.
+
+        Args:
+            room (str): Room name.
+        """
+        refs = self._refs.get(room)
+        if refs is None:
+            return
+        if refs > 1:
+            self._refs[room] = refs - 1
+            return
+        del self._refs[room]
+        if self.linger > 0:
+            loop = asyncio.get_running_loop()
+            self._teardowns[room] = loop.call_later(self.linger, self._teardown, room)
+        else:
+            self._teardown(room)
+
+    def _teardown(self, room: str):
+        self._teardowns.pop(room, None)
+        if room in self._refs:
+            return  # rejoined meanwhile
+        self._wanted.pop(overlay_channel_name(room), None)
+        self._dirty.set()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns listener counters.
+
+        Returns:
+            Dict[str, int]: Watched rooms, live broker channels and teardowns waiting on the debounce.
+        """
+        return {
+            "listeners": len(self._wanted),
+            "subscribed_channels": len(self._subscribed),
+            "pending_teardowns": len(self._teardowns),
+        }
+
+    def _ensure_running(self):
+        if self._tasks and not any(t.done() for t in self._tasks):
+            return
+        for t in self._tasks:
+            t.cancel()
+        self._subscribed.clear()
+        self._dirty.set()
+        self._tasks = [asyncio.create_task(self._flush_loop()), asyncio.create_task(self._read_loop())]
+
+    async def _get_subscription(self):
+        if self._subscription is None:
+            self._subscription = await self._broker.open_subscription()
+        return self._subscription
+
+    async def _flush_loop(self):
+        """Applies accumulated joins and leaves in one call each per batch window."""
+        while True:
+            await self._dirty.wait()
+            await asyncio.sleep(self.batch_window)  # let concurrent joins pile up
+            self._dirty.clear()
+            flushed, self._flushed = self._flushed, None
+            try:
+                sub = await self._get_subscription()
+                wanted = self._wanted.keys() | self._handlers.keys()
+                to_add = [c for c in wanted if c not in self._subscribed]
+                to_drop = [c for c in self._subscribed if c not in wanted]
+                if to_add:
+                    await sub.subscribe(*to_add)
+                    self._subscribed.update(to_add)
+                if to_drop:
+                    await sub.unsubscribe(*to_drop)
+                    self._subscribed.difference_update(to_drop)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Overlay listener subscribe failed: %s", e)
+                await self._reset()
+            if flushed is not None and not flushed.done():
+                flushed.set_result(None)
+
+    async def _read_loop(self):
+        """Dispatches every message of the shared subscription to its room."""
+        while True:
+            try:
+                sub = await self._get_subscription()
+                msg = await sub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Overlay listener read failed: %s", e)
+                await self._reset()
+                await asyncio.sleep(1.0)
+                continue
+            if msg is None:
+                continue
+            channel, frame = msg
+            handler = self._handlers.get(channel)
+            if handler is not None:
+                try:
+                    await handler(frame)
+                except Exception as e:
+                    logger.error("Broker handler for %s failed: %s", channel, e)
+                continue
+            room = self._wanted.get(channel)
+            if room is not None:
+                try:
+                    await self.rooms.broadcast(room, frame)
+                except Exception as e:
+                    logger.error("Overlay dispatch to %s failed: %s", room, e)
+
+    async def _reset(self):
+        """Drops a broken subscription; the next flush reopens it and resubscribes every room."""
+        sub, self._subscription = self._subscription, None
+        self._subscribed.clear()
+        self._dirty.set()
+        if sub is not None:
+            try:
+                await sub.close()
+            except Exception:
+                pass
+
+    async def close(self):
+        """Stops the listener tasks and releases the subscription."""
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for handle in self._teardowns.values():
+            handle.cancel()
+        self._teardowns.clear()
+        await self._reset()
+        self._wanted.clear()
+        self._handlers.clear()
+        self._refs.clear()
+        self._dirty = asyncio.Event()  # the next start may run on another event loop (e.g. tests)
+
+room_listener = RoomListener(rooms)
 
 async def ensure_room_listener(channel: str):
-    """Ensures a Redis listener task is running for the specified channel."""
+    """Ensures the shared broker subscription covers the specified channel."""
     broker = _get_broker()
     if broker is None:
         return  # no broker configured
-    
-    if channel in _room_listeners and not _room_listeners[channel].done():
-        return  # already running
-    
-    async def _listen():
-        try: 
-            redis_channel = overlay_channel_name(channel)
-            async for message in broker.subscribe(redis_channel):
-                await rooms.broadcast(channel, message)
-        except asyncio.CancelledError:
-            pass
-        except Exception:
-            pass
-        finally:
-            _room_listeners.pop(channel, None)
+    await room_listener.watch(broker, channel)
 
-    _room_listeners[channel] = asyncio.create_task(_listen())
\ No newline at end of file
+def release_room_listener(channel: str):
+    """Releases a reference taken by ensure_room_listener; no-op if the room was never watched."""
+    room_listener.release(channel)
+
+def overlay_stats() -> Dict[str, int]:
+    """
+    Returns live overlay counters for monitoring.
+
+    Returns:
+        Dict[str, int]: Live rooms and sockets, plus the shared listener counters.
+    """
+    return {
+        "rooms": len(rooms.rooms),
+        "sockets": sum(len(m) for m in rooms.rooms.values()),
+        "binary_sockets": sum(p.fmt != wire.DEFAULT_FORMAT or p.deflate for m in rooms.rooms.values() for p in m.values()),
+        "deflate_sockets": sum(p.deflate for m in rooms.rooms.values() for p in m.values()),
+        **room_listener.stats(),
+    }
@@ -3,12 +3,65 @@ from fastapi import HTTPException
 from starlette import status
 from app.core.state import PALETTE
 from app.db.uow import UnitOfWork
-from app.services.overlay import send_event, make_duck_update_event
+from app.repository.pairing import CodeSpaceExhausted
+from app.models.pairing import PairingCode
+from app.schemas.duck import DuckOut
+from app.schemas.events import PairingClaimedEvent, PairingExpiredEvent
+from app.services.overlay import send_event, duck_update_payload
 from app.utils.timezone import ensure_aware
 
 # Set of allowed public duck colors for guests
 _ALLOWED = {c["hex"] for c in PALETTE["public"]}  # Guests: public only
 
+def pairing_room(code: str) -> str:
+    """
+    Returns the overlay room a guest joins to wait for the outcome of a pairing code.
+
+    Args:
+        code (str): The pairing code.
+
+    Returns:
+        str: Room name.
+    """
+    return f"pairing:{code}"
+
+def seconds_left(rec: PairingCode) -> int:
+    """
+    Returns the remaining lifetime of a pairing code, in whole seconds (never negative).
+
+    Args:
+        rec (PairingCode): The pairing code.
+
+    Returns:
+        int: Seconds until expiry.
+    """
+    return max(0, int((ensure_aware(rec.expires_at) - datetime.now(timezone.utc)).total_seconds()))
+
+def make_pairing_claimed_event(code: str, duck_color: str) -> PairingClaimedEvent:
+    """
+    Creates the event sent to guests waiting on a code once it is claimed.
+
+    Args:
+        code (str): The claimed pairing code.
+        duck_color (str): Color applied to the viewer's duck.
+
+    Returns:
+        PairingClaimedEvent: Event formatted for the guest page.
+    """
+    return PairingClaimedEvent(type="pairing_claimed", code=code, duck=DuckOut(duck_color=duck_color))
+
+def make_pairing_expired_event(code: str) -> PairingExpiredEvent:
+    """
+    Creates the event sent to guests whose code expired unclaimed.
+
+    Args:
+        code (str): The expired pairing code.
+
+    Returns:
+        PairingExpiredEvent: Event formatted for the guest page.
+    """
+    return PairingExpiredEvent(type="pairing_expired", code=code)
+
 def validate_public_color(hex_: str) -> str:
     """
     Validates that the provided color is allowed for guests.
@@ -37,20 +90,27 @@ async def create_pairing_code(uow: UnitOfWork, duck_color: str, channel: str = "
 
     Returns:
         dict: Contains the pairing code and its expiration time in seconds.
+
+    Raises:
+        HTTPException: If the color is not allowed (400) or no free code was found (503).
     """
     validate_public_color(duck_color)
     pairing_repo = uow.pairing
-    rec = await pairing_repo.create(duck_color, channel)
+    try:
+        rec = await pairing_repo.create(duck_color, channel)
+    except CodeSpaceExhausted:
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, "No pairing code available, retry later")
     await uow.commit()
     return {
         "code": rec.code,
-        "expires_in": max(0, int((ensure_aware(rec.expires_at) - datetime.now(timezone.utc)).total_seconds()))
+        "expires_in": seconds_left(rec)
     }
 
 async def claim_pairing_code(uow: UnitOfWork, code: str, user_id: str, channel: str) -> dict:
     """
     Claims a pairing code and applies the duck color to the user.
-    Handles all business logic and repository calls.
+    The code is consumed atomically (see PairingRepository.claim), then the user is upserted;
+    concurrent claims of the same code have exactly one winner.
 
     Args:
         uow (UnitOfWork): UnitOfWork instance containing repositories and session.
@@ -62,24 +122,21 @@ async def claim_pairing_code(uow: UnitOfWork, code: str, user_id: str, channel:
         dict: Result of the claim operation (success or error).
     """
     pairing_repo = uow.pairing
-    user_repo = uow.users
-
-    rec = await pairing_repo.get(code)
-    if not rec:
-        return {"error": "Invalid code"}
-    if rec.channel != channel:
-        return {"error": "Wrong channel"}
-    if ensure_aware(rec.expires_at) <= datetime.now(timezone.utc):
+
+    rec = await pairing_repo.claim(code, channel)
+    if rec is None:
+        # Slow path only: find out why the claim failed
+        stale = await pairing_repo.get(code)
+        if not stale:
+            return {"error": "Invalid code"}
+        if stale.channel != channel:
+            return {"error": "Wrong channel"}
         await pairing_repo.delete(code)
         await uow.commit()
         return {"error": "Expired"}
 
-    user = await user_repo.get(user_id)
-    if not user:
-        await user_repo.create(user_id, display=user_id, duck_color=rec.duck_color)
-    else:
-        await user_repo.patch(user_id, {"duck_color": rec.duck_color})
-    await pairing_repo.delete(code)
+    await uow.users.upsert_color(user_id, rec.duck_color)
     await uow.commit()
-    await send_event(channel, make_duck_update_event(user_id, rec.duck_color))
+    await send_event(channel, duck_update_payload(user_id, rec.duck_color))
+    await send_event(pairing_room(code), make_pairing_claimed_event(code, rec.duck_color))
     return {"ok": True, "duck_color": rec.duck_color}
\ No newline at end of file
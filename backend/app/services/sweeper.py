@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+from app.core.settings import settings
+from app.db.uow import UowFactory, uow_scope
+
+logger = logging.getLogger(__name__)
+
+class PairingSweeper:
+    """
+    Background task deleting expired pairing codes in bounded batches.
+
+    Each batch runs in its own short transaction so SQLite's write lock is never held for long,
+    and the loop yields to the event loop between batches.
+
+    Attributes:
+        interval (float): Seconds between two sweeps.
+        batch_size (int): Maximum rows deleted per transaction.
+        runs (int): Completed sweeps.
+        rows_swept (int): Total rows deleted.
+        seconds_spent (float): Total time spent sweeping.
+    """
+    def __init__(self, uow_factory: UowFactory = uow_scope,
+                 interval: Optional[float] = None, batch_size: Optional[int] = None):
+        self.uow_factory = uow_factory
+        self.interval = settings.PAIRING_SWEEP_INTERVAL_SECONDS if interval is None else interval
+        self.batch_size = settings.PAIRING_SWEEP_BATCH_SIZE if batch_size is None else batch_size
+        self.runs = 0
+        self.rows_swept = 0
+        self.seconds_spent = 0.0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def sweep_once(self) -> int:
+        """
+        Deletes every currently expired code, one batch per transaction.
+
+        Returns:
+            int: Number of rows deleted by this sweep.
+        """
+        start = time.perf_counter()
+        swept = 0
+        try:
+            while True:
+                async with self.uow_factory() as uow:
+                    n = await uow.pairing.delete_expired(self.batch_size)
+                    await uow.commit()
+                swept += n
+                if n < self.batch_size:
+                    break
+                await asyncio.sleep(0)  # let requests in between batches
+        finally:
+            self.runs += 1
+            self.rows_swept += swept
+            self.seconds_spent += time.perf_counter() - start
+        return swept
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep_once()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error("Pairing sweep failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Starts the periodic sweep (no-op if already running, disabled with interval <= 0, or codes live in Redis)."""
+        if self.interval <= 0 or settings.PAIRING_BACKEND == "redis" or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancels the periodic sweep and waits for it to finish."""
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns sweeper metrics.
+
+        Returns:
+            Dict[str, Any]: Runs, rows swept, time spent and the last error (if any).
+        """
+        return {
+            "runs": self.runs,
+            "rows_swept": self.rows_swept,
+            "seconds_spent": round(self.seconds_spent, 6),
+            "last_error": self.last_error,
+        }
+
+pairing_sweeper = PairingSweeper()
@@ -0,0 +1,143 @@
+"""
+Wire formats an overlay WebSocket can negotiate.
+
+- "json" (default): the event object as JSON text frames, unchanged for existing overlays.
+- "compact": binary frames holding a JSON array `[type, *fields]`, fields in the order of LAYOUTS.
+- "msgpack": binary frames holding the event object packed with MessagePack (needs `msgpack`).
+
+Event types missing from LAYOUTS are sent as plain objects in every format, so compact
+clients can tell them apart (object vs array) and decode them by key.
+
+Any format can be combined with "deflate": each frame is compressed once per room as a
+standalone raw-deflate message (no context takeover) and sent as a binary frame, which
+browsers inflate with `DecompressionStream("deflate-raw")`.
+"""
+import zlib
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple, Union
+from app.core import codec
+from app.core.settings import settings
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+DEFAULT_FORMAT = "json"
+SUBPROTOCOL_PREFIX = "quack."
+DEFLATE_SUFFIX = "+deflate"
+
+# Positional layout per event type; a field is a key path into the event object
+LAYOUTS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "chat": (("user_id",), ("display",), ("message",), ("duck", "duck_color"), ("v",)),
+    "duck_update": (("user_id",), ("duck", "duck_color"), ("v",)),
+    "pairing_claimed": (("code",), ("duck", "duck_color"), ("v",)),
+    "pairing_expired": (("code",), ("v",)),
+}
+
+def available_formats() -> Tuple[str, ...]:
+    """
+    Lists the wire formats this process can encode.
+
+    Returns:
+        Tuple[str, ...]: Format names, "msgpack" only when the package is installed.
+    """
+    return ("json", "compact", "msgpack") if msgpack is not None else ("json", "compact")
+
+def _field(payload: Mapping[str, Any], path: Tuple[str, ...]) -> Any:
+    value: Any = payload
+    for key in path:
+        value = value[key]
+    return value
+
+def to_positional(payload: Mapping[str, Any]) -> Any:
+    """
+    Flattens an event into its positional array, or returns it unchanged if its type has no layout.
+
+    Args:
+        payload (Mapping[str, Any]): Event object.
+
+    Returns:
+        Any: `[type, *fields]`, or the event object itself.
+    """
+    layout = LAYOUTS.get(payload.get("type"))
+    if layout is None:
+        return payload
+    return [payload["type"], *(_field(payload, path) for path in layout)]
+
+def encode(payload: Mapping[str, Any], fmt: str) -> bytes:
+    """
+    Encodes an event object into a binary frame.
+
+    Args:
+        payload (Mapping[str, Any]): Event object.
+        fmt (str): "compact" or "msgpack".
+
+    Returns:
+        bytes: Frame body.
+
+    Raises:
+        ValueError: If the format is unknown or unavailable.
+    """
+    if fmt == "compact":
+        return codec.dumps_bytes(to_positional(payload))
+    if fmt == "msgpack" and msgpack is not None:
+        return msgpack.packb(payload)
+    raise ValueError(f"Unsupported wire format: {fmt!r}")
+
+def deflate(frame: Union[str, bytes], level: Optional[int] = None) -> bytes:
+    """
+    Compresses a frame as a standalone raw-deflate message.
+    A fresh compressor per message keeps frames independent, so one result can go to every socket.
+
+    Args:
+        frame (str | bytes): Encoded frame.
+        level (int | None): zlib level (default: OVERLAY_DEFLATE_LEVEL).
+
+    Returns:
+        bytes: Raw deflate stream (no zlib header), flushed to a byte boundary.
+    """
+    data = frame.encode() if isinstance(frame, str) else frame
+    c = zlib.compressobj(settings.OVERLAY_DEFLATE_LEVEL if level is None else level, zlib.DEFLATED, -15)
+    return c.compress(data) + c.flush()
+
+
+class Negotiated(NamedTuple):
+    """Outcome of negotiate: format is None when the client asked for something unsupported."""
+    fmt: Optional[str]
+    deflate: bool = False
+    subprotocol: Optional[str] = None
+
+def _parse(name: str) -> Tuple[str, bool]:
+    name = name.lower()
+    if name.endswith(DEFLATE_SUFFIX):
+        return name[:-len(DEFLATE_SUFFIX)], True
+    return name, False
+
+def negotiate(requested: Optional[str], subprotocols: Iterable[str], compress: Optional[str] = None) -> Negotiated:
+    """
+    Picks the wire format of a new socket from the `encoding`/`compress` query parameters,
+    or else from the first offered "quack.<format>[+deflate]" subprotocol this process supports.
+
+    Args:
+        requested (str | None): Value of the `encoding` query parameter.
+        subprotocols (Iterable[str]): Subprotocols offered by the client, in preference order.
+        compress (str | None): Value of the `compress` query parameter ("deflate" or None).
+
+    Returns:
+        Negotiated: Format, whether frames are deflated, and the subprotocol to accept.
+    """
+    formats = available_formats()
+    offered = [p for p in subprotocols if p.startswith(SUBPROTOCOL_PREFIX)]
+    if requested or compress:
+        fmt = (requested or DEFAULT_FORMAT).lower()
+        if fmt not in formats or compress not in (None, "deflate"):
+            return Negotiated(None)
+        deflated = compress == "deflate"
+        proto = SUBPROTOCOL_PREFIX + fmt + (DEFLATE_SUFFIX if deflated else "")
+        return Negotiated(fmt, deflated, proto if proto in offered else None)
+    for proto in offered:
+        fmt, deflated = _parse(proto[len(SUBPROTOCOL_PREFIX):])
+        if fmt in formats:
+            return Negotiated(fmt, deflated, proto)
+    return Negotiated(DEFAULT_FORMAT)
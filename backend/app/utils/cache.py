@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+class TTLCache(Generic[V]):
+    """
+    Bounded in-process cache with LRU eviction and per-entry expiry.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept.
+        ttl (float): Default time-to-live of an entry (seconds).
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that found nothing (or an expired entry).
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """
+        Returns the cached value for `key`, or None if missing or expired.
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            Optional[V]: The cached value.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """
+        Returns the cached value for `key` like get, without counting a hit or miss
+        nor refreshing its LRU position (for opportunistic reads by other caches).
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            Optional[V]: The cached value, or None if missing or expired.
+        """
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value, evicting the least recently used entry when full.
+
+        Args:
+            key (Hashable): Cache key.
+            value (V): Value to store.
+            ttl (Optional[float]): Time-to-live for this entry; defaults to the cache ttl.
+        """
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Removes an entry if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes every entry."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns cache counters.
+
+        Returns:
+            Dict[str, Any]: Size, hits and misses.
+        """
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,283 @@
+"""
+Twitch IRC chat ingestion worker.
+
+Run from backend/ (channels from IRC_CHANNELS, or as arguments):
+    python -m app.workers.irc [channel ...]
+
+Holds one IRC connection per IRC_CHANNELS_PER_CONNECTION channels and streams every PRIVMSG
+through bounded stages: read/parse -> enrich with duck colors -> publish to the broker.
+A slow stage fills the queue in front of it, which stalls the stages before it down to the
+socket reads, so TCP flow control pushes back on the IRC server instead of memory growing.
+"""
+import asyncio
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from app.core.settings import settings
+from app.core.user_cache import duck_colors, handle_duck_update, handle_user_invalidation
+from app.db.uow import uow_scope
+from app.repository.user import DEFAULT_COLOR
+from app.services.overlay import Frame, chat_payload, encode_event, overlay_channel_name, room_listener
+
+ColorResolver = Callable[[Iterable[str]], Awaitable[Dict[str, str]]]
+
+
+class ChatLine(NamedTuple):
+    """A chat message parsed from a PRIVMSG line."""
+    room: str
+    user_id: str
+    display: str
+    message: str
+
+
+def room_for(channel: str) -> str:
+    """
+    Maps a Twitch channel login to the overlay room its chat is broadcast to.
+
+    Args:
+        channel (str): Channel login, with or without the leading "#".
+
+    Returns:
+        str: Room name ("channel:<login>").
+    """
+    return f"channel:{channel.lstrip('#').lower()}"
+
+_TAG_ESCAPES = {":": ";", "s": " ", "\\": "\\", "r": "\r", "n": "\n"}
+
+def _unescape_tag(value: str) -> str:
+    """Decodes an IRCv3 tag value (`\\s` -> space, `\\:` -> ";", ...); unknown escapes keep the character."""
+    if "\\" not in value:
+        return value
+    out, chars = [], iter(value)
+    for c in chars:
+        if c == "\\":
+            c = next(chars, "")
+            c = _TAG_ESCAPES.get(c, c)
+        out.append(c)
+    return "".join(out)
+
+def parse_privmsg(line: str) -> Optional[ChatLine]:
+    """
+    Parses one IRC line (IRCv3 tags allowed) into a chat message.
+
+    Args:
+        line (str): Raw line without the trailing CRLF.
+
+    Returns:
+        Optional[ChatLine]: The message, or None if the line is not a channel PRIVMSG.
+    """
+    tags = ""
+    if line.startswith("@"):
+        tags, _, line = line.partition(" ")
+    if not line.startswith(":"):
+        return None
+    prefix, _, rest = line[1:].partition(" ")
+    command, _, rest = rest.partition(" ")
+    if command != "PRIVMSG":
+        return None
+    target, _, text = rest.partition(" :")
+    if not target.startswith("#") or not text:
+        return None
+    if text.startswith("\x01ACTION ") and text.endswith("\x01"):  # /me
+        text = text[8:-1]
+    nick = prefix.partition("!")[0]
+    uid = display = ""
+    for item in tags[1:].split(";") if tags else ():
+        key, _, value = item.partition("=")
+        if key == "user-id":
+            uid = _unescape_tag(value)
+        elif key == "display-name":
+            display = _unescape_tag(value)
+    return ChatLine(room_for(target), f"twitch:{uid or nick}", display or nick, text)
+
+async def _load_colors(user_ids: list[str]) -> Dict[str, str]:
+    async with uow_scope() as uow:
+        return await uow.users.get_colors(user_ids)
+
+async def resolve_colors(user_ids: Iterable[str]) -> Dict[str, str]:
+    """Default color resolver: the duck color cache, misses loaded with one short-lived unit of work per batch."""
+    return await duck_colors.get_many(user_ids, _load_colors)
+
+
+class IrcWorker:
+    """
+    Streams chat from Twitch IRC into the overlay broker.
+
+    Attributes:
+        channels (List[str]): Channel logins to join.
+        received (int): PRIVMSG lines parsed.
+        published (int): Chat events handed to the broker.
+        dropped (int): Chat events lost because the broker rejected them.
+        reconnects (int): Connections re-established after a failure.
+        last_error (str | None): Last connection or stage error.
+    """
+    def __init__(self, broker, channels: Sequence[str], *,
+                 host: Optional[str] = None, port: Optional[int] = None,
+                 nick: Optional[str] = None, token: Optional[str] = None,
+                 per_connection: Optional[int] = None, queue_size: Optional[int] = None,
+                 batch_size: Optional[int] = None, resolve_colors: ColorResolver = resolve_colors):
+        self.broker = broker
+        self.channels = [c.lstrip("#").lower() for c in channels]
+        self.host = host or settings.IRC_HOST
+        self.port = port or settings.IRC_PORT
+        self.nick = nick or settings.IRC_NICK
+        self.token = settings.IRC_TOKEN if token is None else token
+        self.per_connection = per_connection or settings.IRC_CHANNELS_PER_CONNECTION
+        self.batch_size = batch_size or settings.IRC_BATCH_SIZE
+        self.resolve_colors = resolve_colors
+        size = queue_size or settings.IRC_QUEUE_SIZE
+        self._lines: asyncio.Queue[ChatLine] = asyncio.Queue(size)
+        self._frames: asyncio.Queue[Tuple[str, Frame]] = asyncio.Queue(size)
+        self._tasks: List[asyncio.Task] = []
+        self.received = 0
+        self.published = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+
+    # --- Stage 1: connections --- #
+
+    async def _connect(self, channels: Sequence[str]) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=2**16)
+        handshake = (
+            "CAP REQ :twitch.tv/tags\r\n"
+            + (f"PASS {self.token}\r\n" if self.token else "")
+            + f"NICK {self.nick}\r\n"
+            + "".join(f"JOIN #{c}\r\n" for c in channels)
+        )
+        writer.write(handshake.encode())
+        await writer.drain()
+        return reader, writer
+
+    async def _read(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while True:
+            raw = await reader.readline()
+            if not raw:
+                raise ConnectionError("IRC server closed the connection")
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            if line.startswith("PING"):
+                writer.write(b"PONG" + raw[4:])
+                await writer.drain()
+                continue
+            msg = parse_privmsg(line)
+            if msg is not None:
+                self.received += 1
+                await self._lines.put(msg)  # blocks while enrichment is behind: stop reading the socket
+
+    async def _connection(self, channels: Sequence[str]):
+        delay = 1.0
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect(channels)
+                delay = 1.0
+                await self._read(reader, writer)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                self.reconnects += 1
+            finally:
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    # --- Stages 2 and 3: enrichment and publishing --- #
+
+    @staticmethod
+    async def _batch(queue: asyncio.Queue, limit: int) -> list:
+        """Waits for one item, then takes whatever else is already queued, up to `limit`."""
+        items = [await queue.get()]
+        while len(items) < limit and not queue.empty():
+            items.append(queue.get_nowait())
+        return items
+
+    async def _enrich(self):
+        while True:
+            batch: List[ChatLine] = await self._batch(self._lines, self.batch_size)
+            try:
+                colors = await self.resolve_colors({m.user_id for m in batch})
+            except Exception as e:  # keep chat flowing with default ducks
+                self.last_error = f"{type(e).__name__}: {e}"
+                colors = {}
+            for m in batch:
+                event = chat_payload(m.display, m.message, m.user_id, colors.get(m.user_id, DEFAULT_COLOR))
+                await self._frames.put((m.room, encode_event(event)))
+
+    async def _publish(self):
+        while True:
+            batch: List[Tuple[str, Frame]] = await self._batch(self._frames, self.batch_size)
+            by_room: Dict[str, List[Frame]] = {}
+            for room, frame in batch:
+                by_room.setdefault(room, []).append(frame)
+            for room, frames in by_room.items():
+                try:
+                    await self.broker.publish_many(overlay_channel_name(room), frames)
+                except Exception as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    self.dropped += len(frames)
+                    continue
+                self.published += len(frames)
+
+    # --- Lifecycle --- #
+
+    def start(self):
+        """Opens the IRC connections and starts the pipeline stages (no-op if already running)."""
+        if self._tasks:
+            return
+        groups = [self.channels[i:i + self.per_connection] for i in range(0, len(self.channels), self.per_connection)]
+        self._tasks = [asyncio.create_task(self._connection(g)) for g in groups]
+        self._tasks += [asyncio.create_task(self._enrich()), asyncio.create_task(self._publish())]
+
+    async def stop(self):
+        """Cancels every connection and stage, and waits for them to finish."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns worker metrics.
+
+        Returns:
+            Dict[str, Any]: Message counters, queue depths, reconnects and the last error.
+        """
+        return {
+            "received": self.received,
+            "published": self.published,
+            "dropped": self.dropped,
+            "lines_queued": self._lines.qsize(),
+            "frames_queued": self._frames.qsize(),
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
+
+
+async def main(channels: Sequence[str]) -> None:
+    from app.core.broker import connect_broker
+
+    broker = await connect_broker()  # same BROKER_BACKEND as the web workers
+    await room_listener.add_handler(broker, settings.REDIS_DUCKS_CHANNEL, handle_duck_update)
+    await room_listener.add_handler(broker, settings.REDIS_USERS_CHANNEL, handle_user_invalidation)
+    worker = IrcWorker(broker, channels)
+    worker.start()
+    print(f"IRC worker: {len(worker.channels)} channels on {settings.IRC_HOST}:{settings.IRC_PORT}")
+    start = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(60)
+            rate = worker.published / (time.monotonic() - start)
+            print(f"IRC worker: {worker.stats()} ({rate:.0f} msg/s), colors: {duck_colors.stats()}")
+    finally:
+        await worker.stop()
+        await room_listener.close()
+        await broker.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(sys.argv[1:] or settings.IRC_CHANNELS))
+    except KeyboardInterrupt:
+        pass
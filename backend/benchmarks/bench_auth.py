@@ -0,0 +1,30 @@
+"""
+Microbenchmark: JWT verification with and without the verified-token cache.
+
+Run from backend/:
+    python -m benchmarks.bench_auth [iterations]
+"""
+import sys
+import time
+
+from app.core.jwt import _verify, create_access_token, decode_access_token, token_cache
+
+
+def _rate(fn, token: str, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(token)
+    return n / (time.perf_counter() - start)
+
+
+def main(n: int = 20_000) -> None:
+    token = create_access_token({"sub": "twitch:bench", "display": "Bench"})
+    token_cache.clear()
+    uncached = _rate(_verify, token, n)
+    cached = _rate(decode_access_token, token, n)
+    print(f"uncached: {uncached:>12,.0f} decodes/s")
+    print(f"cached:   {cached:>12,.0f} decodes/s  (x{cached / uncached:.1f})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,108 @@
+"""
+Benchmark: cross-process fan-out through the IPC broker vs Redis pub/sub on localhost.
+
+One publisher process sends timestamped frames to several subscriber processes, first paced
+(1 per ms, for latency: CLOCK_MONOTONIC is shared by every process of the host), then as fast
+as it can (for throughput: frames delivered across all subscribers per second).
+Redis is skipped if REDIS_URL is unreachable.
+
+Run from backend/:
+    python -m benchmarks.bench_broker_fanout [messages] [subscribers]
+"""
+import asyncio
+import multiprocessing as mp
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from app.core import codec
+
+CHANNEL = "overlay:bench"
+PACED = 1_000
+
+
+def _make_broker(backend: str, path: str):
+    if backend == "ipc":
+        from app.core.ipc_broker import IpcBroker
+        return IpcBroker(path)
+    from app.core.redis_broker import RedisBroker
+    return RedisBroker()
+
+
+async def _subscriber(backend: str, path: str, n: int, ready, results) -> None:
+    broker = _make_broker(backend, path)
+    sub = await broker.open_subscription()
+    await sub.subscribe(CHANNEL)
+    ready.set()
+    latencies, received = [], 0
+    while received < PACED + n:
+        msg = await sub.get_message(timeout=5.0)
+        if msg is None:
+            break
+        received += 1
+        if received <= PACED:
+            latencies.append(time.monotonic_ns() - codec.loads(msg[1])["t"])
+    results.put((latencies, received - PACED, time.monotonic_ns()))
+    await sub.close()
+    await broker.close()
+
+
+def _subscriber_main(*args) -> None:
+    asyncio.run(_subscriber(*args))
+
+
+async def _run(backend: str, n: int, subscribers: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "broker.sock")
+    publisher = _make_broker(backend, path)
+    try:
+        await publisher.connect()  # for ipc: the publisher's process hosts the hub
+    except Exception as e:
+        print(f"{backend:<6} skipped: {e}")
+        return
+    ctx = mp.get_context("fork")
+    results = ctx.Queue()
+    readies = [ctx.Event() for _ in range(subscribers)]
+    procs = [ctx.Process(target=_subscriber_main, args=(backend, path, n, r, results)) for r in readies]
+    for p in procs:
+        p.start()
+    while not all(r.is_set() for r in readies):
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)  # let the subscriptions reach the hub / server
+
+    pad = "x" * 100
+    for i in range(PACED):
+        await publisher.publish(CHANNEL, codec.dumps({"t": time.monotonic_ns(), "i": i, "pad": pad}))
+        await asyncio.sleep(0.001)
+    start = time.monotonic_ns()
+    for i in range(n):
+        await publisher.publish(CHANNEL, codec.dumps({"t": time.monotonic_ns(), "i": i, "pad": pad}))
+        if i % 64 == 0:
+            await asyncio.sleep(0)  # let the hub (same loop for ipc) forward
+    outcomes = []
+    while len(outcomes) < subscribers:
+        while results.empty():
+            await asyncio.sleep(0.01)
+        outcomes.append(results.get())
+    for p in procs:
+        p.join()
+    await publisher.close()
+
+    latencies = sorted(l for lat, _, _ in outcomes for l in lat)
+    delivered = sum(count for _, count, _ in outcomes)
+    seconds = (max(end for _, _, end in outcomes) - start) / 1e9
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{backend:<6} {subscribers} subs  latency p50 {statistics.median(latencies) / 1e3:7.1f} us  "
+          f"p99 {p99 / 1e3:7.1f} us  |  flood {delivered:,}/{n * subscribers:,} delivered, "
+          f"{delivered / seconds:,.0f} msg/s")
+
+
+async def main(n: int, subscribers: int) -> None:
+    for backend in ("ipc", "redis"):
+        await _run(backend, n, subscribers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+                     int(sys.argv[2]) if len(sys.argv) > 2 else 4))
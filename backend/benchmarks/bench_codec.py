@@ -0,0 +1,44 @@
+"""
+Microbenchmark: per-event encode/decode cost of the stdlib json module vs the shared codec,
+and cost of building + encoding a chat event through the Pydantic models vs the fast path.
+
+Run from backend/ (JSON_CODEC=json to force the stdlib backend):
+    python -m benchmarks.bench_codec [iterations]
+"""
+import json
+import sys
+import time
+
+from app.core import codec
+from app.services.overlay import _as_payload, chat_payload, encode_event, make_chat_event, make_duck_update_event
+
+
+def _cost(fn, arg, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(arg)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def main(n: int = 100_000) -> None:
+    events = {
+        "chat": _as_payload(make_chat_event("Canard", "coin coin, ça cancane 🦆", "twitch:42", "#FFC93A")),
+        "duck_update": _as_payload(make_duck_update_event("twitch:42", "#FFC93A")),
+    }
+    stdlib_dumps = json.JSONEncoder(separators=(",", ":")).encode
+    print(f"codec backend: {codec.BACKEND}")
+    for name, payload in events.items():
+        frame = codec.dumps(payload)
+        before = (_cost(stdlib_dumps, payload, n), _cost(json.loads, frame, n))
+        after = (_cost(codec.dumps, payload, n), _cost(codec.loads, frame, n))
+        print(f"{name:<12} encode {before[0]:6.2f} -> {after[0]:6.2f} us   "
+              f"decode {before[1]:6.2f} -> {after[1]:6.2f} us   ({len(frame)} bytes)")
+
+    args = ("Canard", "coin coin, ça cancane 🦆", "twitch:42", "#FFC93A")
+    models = _cost(lambda a: encode_event(make_chat_event(*a)), args, n)
+    fast = _cost(lambda a: encode_event(chat_payload(*a)), args, n)
+    print(f"chat build+encode  models {models:6.2f} us -> fast path {fast:6.2f} us")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
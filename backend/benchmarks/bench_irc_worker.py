@@ -0,0 +1,53 @@
+"""
+Benchmark: IRC worker throughput against a local fake IRC server, with a no-op broker and
+an in-memory color resolver, so the figure is the worker's own cost (parse, enrich, encode).
+
+Run from backend/:
+    python -m benchmarks.bench_irc_worker [messages]
+"""
+import asyncio
+import sys
+import time
+
+from app.workers.irc import IrcWorker
+
+
+class _NullBroker:
+    async def publish_many(self, channel, frames):
+        pass
+
+
+async def main(n: int = 200_000) -> None:
+    line = ("@badge-info=;badges=;color=#FF4500;display-name=Canard{i};emotes=;id=abc;mod=0;"
+            "user-id={i};user-type= :canard{i}!canard{i}@canard{i}.tmi.twitch.tv PRIVMSG #bench :coin coin {i}\r\n")
+    payload = "".join(line.format(i=i % 1000) for i in range(n)).encode()
+
+    async def handle(reader, writer):
+        while not (await reader.readline()).startswith(b"JOIN"):
+            pass
+        writer.write(payload)
+        await writer.drain()
+        await reader.read()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    colors = {f"twitch:{i}": "#FFC93A" for i in range(0, 1000, 2)}
+
+    async def resolve(user_ids):
+        return {uid: colors[uid] for uid in user_ids if uid in colors}
+
+    broker = _NullBroker()
+    worker = IrcWorker(broker, ["bench"], host="127.0.0.1", port=server.sockets[0].getsockname()[1],
+                       resolve_colors=resolve)
+    wall, cpu = time.perf_counter(), time.process_time()
+    worker.start()
+    while worker.published < n:
+        await asyncio.sleep(0.01)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    await worker.stop()
+    server.close()
+    print(f"{n:,} messages in {wall:.2f}s: {n / wall:,.0f} msg/s wall, {n / cpu:,.0f} msg/s per CPU-second "
+          "(server and worker share this core)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000))
@@ -0,0 +1,66 @@
+"""
+Benchmark: broadcasting one chat event to a large room, uncompressed vs per-socket deflate
+(what permessage-deflate costs when every connection compresses its own copy) vs deflate
+shared across the room (Rooms with deflate=True).
+
+The "shared" figures assume transport compression is off (uvicorn --ws-per-message-deflate false):
+with permessage-deflate negotiated, the server deflates every socket's copy again on top.
+
+Run from backend/:
+    python -m benchmarks.bench_room_deflate [viewers ...]
+"""
+import asyncio
+import sys
+import time
+
+from app.services import wire
+from app.services.overlay import Rooms, encode_event, make_chat_event
+
+
+class _Socket:
+    """Fake WebSocket counting bytes; optionally compresses each frame itself like a per-connection deflate."""
+    def __init__(self, per_socket_deflate: bool = False):
+        self.per_socket_deflate = per_socket_deflate
+        self.bytes = 0
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        await self.send_bytes(data.encode())
+
+    async def send_bytes(self, data: bytes):
+        if self.per_socket_deflate:
+            data = wire.deflate(data)
+        self.bytes += len(data)
+
+    async def close(self, code: int = 1000, reason=None):
+        pass
+
+
+async def _run(viewers: int, mode: str, events: int = 20) -> tuple[float, float]:
+    room = Rooms()
+    sockets = [_Socket(per_socket_deflate=mode == "per-socket") for _ in range(viewers)]
+    for ws in sockets:
+        await room.add(ws, "bench", deflate=mode == "shared")
+    frame = encode_event(make_chat_event("Canard", "coin coin ! " * 8 + "🦆", "twitch:42", "#FFC93A"))
+    start = time.perf_counter()
+    for _ in range(events):
+        await room.broadcast("bench", frame)
+        while any(p.queue.qsize() for p in room.rooms["bench"].values()):
+            await asyncio.sleep(0)
+    elapsed = (time.perf_counter() - start) / events
+    for ws in sockets:
+        await room.remove(ws, "bench")
+    return elapsed * 1e3, sum(ws.bytes for ws in sockets) / events / viewers
+
+
+async def main(sizes: list[int]) -> None:
+    for viewers in sizes:
+        for mode in ("uncompressed", "per-socket", "shared"):
+            ms, size = await _run(viewers, mode)
+            print(f"{viewers:>6} viewers  {mode:<13} {ms:8.2f} ms/event  {size:6.0f} bytes/socket")
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(a) for a in sys.argv[1:]] or [1_000, 10_000]))
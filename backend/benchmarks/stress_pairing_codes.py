@@ -0,0 +1,60 @@
+"""
+Stress test: create tens of thousands of pairing codes concurrently and count failures.
+
+Uses a throwaway SQLite database. Run from backend/:
+    python -m benchmarks.stress_pairing_codes [total_codes] [workers] [code_length]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.settings import settings
+from app.db.base import Base
+from app.db.uow import UnitOfWork
+from app.models import pairing, user  # noqa: F401 # register tables
+
+
+async def main(total: int, workers: int) -> None:
+    tmpdir = tempfile.TemporaryDirectory()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmpdir.name, 'stress.db')}",
+                                 connect_args={"timeout": 60})
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    per_worker = total // workers
+    failures = 0
+
+    async def worker() -> list[str]:
+        nonlocal failures
+        codes = []
+        async with maker() as session:
+            uow = UnitOfWork(session=session)
+            for i in range(per_worker):
+                try:
+                    codes.append((await uow.pairing.create("#3B82F6", "stress")).code)
+                except Exception:
+                    failures += 1
+                if i % 100 == 99:
+                    await uow.commit()
+            await uow.commit()
+        return codes
+
+    start = time.perf_counter()
+    batches = await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - start
+    codes = [c for batch in batches for c in batch]
+    print(f"codes: {len(codes):,}  unique: {len(set(codes)):,}  failures: {failures}  "
+          f"length: {settings.PAIRING_CODE_LENGTH}  {len(codes) / elapsed:,.0f} codes/s")
+    await engine.dispose()
+    tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    if len(args) > 2:
+        settings.PAIRING_CODE_LENGTH = args[2]
+    asyncio.run(main(args[0] if args else 50_000, args[1] if len(args) > 1 else 50))
@@ -36,7 +36,8 @@ async def engine(sqlite_url):
         AsyncEngine: The SQLAlchemy async engine.
     """
     url, tmpdir = sqlite_url
-    engine = create_async_engine(url, echo=False, future=True)
+    # generous busy timeout: concurrency tests make many connections contend for SQLite's write lock
+    engine = create_async_engine(url, echo=False, future=True, connect_args={"timeout": 30})
     async with engine.begin() as conn:
         await conn.run_sync(models_base.metadata.create_all)
     try:
@@ -83,7 +84,7 @@ async def db_session(session_maker) -> AsyncGenerator[AsyncSession, None]:
 def _test_settings(sqlite_url, monkeypatch):
     """
     Automatically sets environment variables and settings for tests.
-    Forces the app into DEV mode, sets a test secret, and uses the test database.
+    Forces the app into DEV mode, sets a test secret, and uses the test database and the in-memory broker.
 
     Args:
         sqlite_url (tuple): The test database URL and TemporaryDirectory.
@@ -100,6 +101,22 @@ def _test_settings(sqlite_url, monkeypatch):
     settings.SECRET_KEY = "test-secret"
     settings.ACCESS_TOKEN_EXPIRE_MINUTES = 60
     settings.DATABASE_URL = url
+    settings.BROKER_BACKEND = "memory"  # no Redis in tests; broker tests pick their backend explicitly
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """
+    Empties the process-wide caches so rows rolled back by one test never leak into the next.
+    """
+    from app.core.jwt import token_cache
+    from app.core.user_cache import claims_versions, duck_colors, user_cache
+    for cache in (user_cache, token_cache, claims_versions, duck_colors):
+        cache.clear()
+    for counters in (user_cache, token_cache):
+        counters.hits = counters.misses = 0
+    yield
+    for cache in (user_cache, token_cache, claims_versions, duck_colors):
+        cache.clear()
 
 @pytest.fixture(autouse=True)
 def override_uow(db_session):
@@ -118,6 +135,37 @@ def override_uow(db_session):
     yield
     app.dependency_overrides.clear()
 
+@pytest.fixture
+def ws_client(sqlite_url):
+    """
+    Starlette TestClient for WebSocket tests, with a dedicated engine.
+    The TestClient runs the app on its own event loop, so WebSocket handlers get short-lived
+    UnitOfWorks from this engine (get_uow_factory override) instead of the per-test session.
+
+    Args:
+        sqlite_url (tuple): The test database URL and TemporaryDirectory.
+
+    Yields:
+        tuple: (TestClient, async_sessionmaker, AsyncEngine); run coroutines with client.portal.call.
+    """
+    from contextlib import asynccontextmanager
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    from starlette.testclient import TestClient
+    from app.db.uow import get_uow_factory
+
+    engine = create_async_engine(sqlite_url[0], poolclass=AsyncAdaptedQueuePool, connect_args={"timeout": 30})
+    maker = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+
+    @asynccontextmanager
+    async def scope():
+        async with maker() as session:
+            yield UnitOfWork(session)
+
+    app.dependency_overrides[get_uow_factory] = lambda: scope
+    with TestClient(app) as tc:
+        yield tc, maker, engine
+        tc.portal.call(engine.dispose)
+
 @pytest.fixture
 async def client():
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
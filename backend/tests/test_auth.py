@@ -10,4 +10,147 @@ async def test_login_and_me(client):
     assert r2.status_code == 200
     me = r2.json()
     assert me["display"] == "Liargo Test"
-    assert "user_id" in me
\ No newline at end of file
+    assert "user_id" in me
+
+def test_token_cache_never_outlives_signing_key(monkeypatch):
+    from fastapi import HTTPException
+    from app.core.jwt import create_access_token, decode_access_token, token_cache
+    from app.core.settings import settings
+
+    token = create_access_token({"sub": "twitch:cache"})
+    assert decode_access_token(token)["sub"] == "twitch:cache"
+    assert decode_access_token(token)["sub"] == "twitch:cache"
+    assert token_cache.hits == 1
+
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "rotated")
+    with pytest.raises(HTTPException) as exc:
+        decode_access_token(token)
+    assert exc.value.status_code == 401
+
+
+class _KeyStore:
+    """In-memory stand-in for the Redis commands ClaimsVersions uses (GET, pipelined SET)."""
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def set(self, key, value, ex=None):
+        self.data[key] = str(value)
+
+    async def execute(self):
+        pass
+
+
+@pytest.fixture
+def claims_store(monkeypatch):
+    from app.core.settings import settings
+    from app.core.user_cache import claims_versions
+
+    store = _KeyStore()
+    monkeypatch.setattr(claims_versions, "client", store)
+    monkeypatch.setattr(settings, "JWT_IDENTITY_CLAIMS", True)
+    return store
+
+
+@pytest.mark.anyio
+async def test_identity_claims_skip_db_until_stale(client, monkeypatch, claims_store):
+    from app.repository.user import UsersRepository
+
+    r = await client.post("/auth/login", params={"display": "Claims"})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    real_get = UsersRepository.get
+    reads = []
+    async def counting_get(self, user_id):
+        reads.append(user_id)
+        return await real_get(self, user_id)
+    monkeypatch.setattr(UsersRepository, "get", counting_get)
+
+    assert (await client.get("/auth/me", headers=headers)).json()["display"] == "Claims"
+    assert (await client.get("/me/duck", headers=headers)).status_code == 200
+    assert reads == []
+
+    await client.patch("/me/duck", headers=headers, json={"duck_color": "#FFC93A"})
+    reads.clear()
+    r = await client.get("/me/duck", headers=headers)
+    assert r.json()["duck"]["duck_color"] == "#FFC93A"
+    assert reads  # the token's claims_version is stale now
+
+
+@pytest.mark.anyio
+async def test_identity_claims_checked_against_shared_versions(client, monkeypatch, claims_store):
+    from app.core.jwt import decode_access_token
+    from app.core.user_cache import claims_versions, user_cache
+    from app.repository.user import UsersRepository
+
+    r = await client.post("/auth/login", params={"display": "Shared"})
+    token = r.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    uid = decode_access_token(token)["sub"]
+
+    real_get = UsersRepository.get
+    reads = []
+    async def counting_get(self, user_id):
+        reads.append(user_id)
+        return await real_get(self, user_id)
+    monkeypatch.setattr(UsersRepository, "get", counting_get)
+
+    # Another worker changed the user; this one restarted and never saw the invalidation
+    claims_store.data[f"claims:{uid}"] = "1"
+    claims_versions.clear()
+    user_cache.clear()
+    assert (await client.get("/me/duck", headers=headers)).status_code == 200
+    assert reads == [uid]
+
+    # Redis unreachable: the claims cannot be vouched for, the database answers
+    async def unreachable(key):
+        raise ConnectionError("redis down")
+    monkeypatch.setattr(claims_store, "get", unreachable)
+    claims_versions.clear()
+    user_cache.clear()
+    reads.clear()
+    assert (await client.get("/auth/me", headers=headers)).json()["display"] == "Shared"
+    assert reads == [uid]
+
+
+@pytest.mark.anyio
+async def test_identity_claims_ignored_once_disabled(client, monkeypatch, claims_store):
+    from app.core.jwt import token_cache
+    from app.core.settings import settings
+    from app.core.user_cache import claims_versions, user_cache
+
+    r = await client.post("/auth/login", params={"display": "Disabled"})
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    monkeypatch.setattr(settings, "JWT_IDENTITY_CLAIMS", False)  # versions are no longer recorded
+
+    await client.patch("/me/duck", headers=headers, json={"duck_color": "#FFC93A"})
+    for cache in (claims_versions, token_cache, user_cache):
+        cache.clear()  # as after a restart, or on another worker
+    r = await client.get("/me/duck", headers=headers)
+    assert r.json()["duck"]["duck_color"] == "#FFC93A"
+
+
+@pytest.mark.anyio
+async def test_metrics_need_a_key_in_prod(client, monkeypatch):
+    from app.core.settings import settings
+
+    assert (await client.get("/metrics")).status_code == 200  # dev
+    assert (await client.get("/_dev/overlay/stats")).json()["sockets"] == 0
+
+    monkeypatch.setattr(settings, "ENV", "prod")
+    assert (await client.get("/metrics")).status_code == 404
+    monkeypatch.setattr(settings, "METRICS_API_KEY", "scrape-me")
+    assert (await client.get("/metrics", headers={"X-Api-Key": "wrong"})).status_code == 401
+    r = await client.get("/metrics", headers={"X-Api-Key": "scrape-me"})
+    assert r.status_code == 200 and "user_cache" in r.json()
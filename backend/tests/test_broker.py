@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.core.broker import InMemoryBroker
+
+
+async def test_in_memory_broker_pubsub_semantics():
+    broker = InMemoryBroker()
+    a, b = await broker.open_subscription(), await broker.open_subscription()
+    await broker.publish("c1", "before")  # nobody listening yet: dropped, like Redis
+    await a.subscribe("c1", "c2")
+    await b.subscribe("c1")
+
+    await broker.publish("c1", {"n": 1})
+    await broker.publish_many("c2", ["x", b"y"])
+    assert [await a.get_message(0) for _ in range(3)] == [("c1", '{"n":1}'), ("c2", "x"), ("c2", b"y")]
+    assert await b.get_message(0) == ("c1", '{"n":1}')
+    assert await b.get_message(0.01) is None
+
+    await a.unsubscribe("c1")
+    await broker.publish("c1", "only b")
+    assert await a.get_message(0.01) is None
+    assert await b.get_message(0) == ("c1", "only b")
+    await broker.close()
+    await broker.publish("c2", "after close")
+    assert await a.get_message(0.01) is None
+
+
+async def test_in_memory_broker_subscribe_decodes():
+    broker = InMemoryBroker()
+    received = []
+
+    async def consume():
+        async for msg in broker.subscribe("c"):
+            received.append(msg)
+            if len(received) == 2:
+                return
+
+    task = asyncio.create_task(consume())
+    while not broker._subscribers:
+        await asyncio.sleep(0)
+    await broker.publish("c", "not json")
+    await broker.publish("c", {"a": 1})
+    await broker.publish("c", '{"b":2}')
+    await asyncio.wait_for(task, 1)
+    assert received == [{"a": 1}, {"b": 2}]
+
+
+async def test_connect_broker_falls_back_only_when_allowed(monkeypatch):
+    from app.core.broker import connect_broker
+    from app.core.settings import settings
+    monkeypatch.setattr(settings, "BROKER_BACKEND", "redis")
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1/0")  # nothing listens there
+
+    monkeypatch.setattr(settings, "BROKER_FALLBACK", "")
+    with pytest.raises(Exception):
+        await connect_broker()
+
+    monkeypatch.setattr(settings, "BROKER_FALLBACK", "memory")
+    assert isinstance(await connect_broker(), InMemoryBroker)
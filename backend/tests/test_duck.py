@@ -20,4 +20,79 @@ async def test_get_and_patch_duck(client, auth_token):
     )
     assert r2.status_code == 200
     duck2 = r2.json().get("duck")
-    assert duck2["duck_color"] == new_color
\ No newline at end of file
+    assert duck2["duck_color"] == new_color
+
+
+@pytest.mark.anyio
+async def test_current_user_cache_invalidated_by_patch(client, auth_token):
+    from app.core.user_cache import user_cache
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    await client.get("/me/duck", headers=headers)
+    hits = user_cache.hits
+    r = await client.get("/me/duck", headers=headers)
+    assert user_cache.hits == hits + 1
+
+    await client.patch("/me/duck", headers=headers, json={"duck_color": "#EF4444"})
+    r = await client.get("/me/duck", headers=headers)
+    assert r.json()["duck"]["duck_color"] == "#EF4444"
+
+
+@pytest.mark.anyio
+async def test_get_colors_leaves_user_cache_counters_alone(client, auth_token, session_maker):
+    from app.core.user_cache import user_cache
+    from app.db.uow import UnitOfWork
+    await client.get("/me/duck", headers={"Authorization": f"Bearer {auth_token}"})  # warms the user cache
+    (uid,) = list(user_cache._data)
+    before = user_cache.stats()
+
+    uow = UnitOfWork(session_factory=session_maker)
+    try:
+        colors = await uow.users.get_colors([uid, "unknown"])
+    finally:
+        await uow.close()
+
+    assert colors == {uid: user_cache.peek(uid).duck_color}
+    assert user_cache.stats() == before
+
+
+@pytest.mark.anyio
+async def test_patch_duck_statement_count(client, auth_token, engine):
+    from sqlalchemy import event
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    await client.get("/me/duck", headers=headers)  # warms the user cache
+
+    statements = []
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        r = await client.patch("/me/duck", headers=headers, json={"duck_color": "#3B82F6"})
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _count)
+
+    assert r.json()["duck"]["duck_color"] == "#3B82F6"
+    assert statements == ["UPDATE"]
+
+
+@pytest.mark.anyio
+async def test_failed_commit_announces_no_color(session_maker, monkeypatch):
+    import app.services.ducks as ducks_module
+    from app.db.uow import UnitOfWork
+    sent = []
+
+    async def record(channel, payload):
+        sent.append(payload)
+    monkeypatch.setattr(ducks_module, "send_event", record)
+
+    uow = UnitOfWork(session_factory=session_maker)
+    await uow.users.upsert_color("twitch:busy", "#8A2BE2")
+    await uow.commit()
+
+    async def busy():
+        raise RuntimeError("database is locked")
+    monkeypatch.setattr(uow, "commit", busy)
+    with pytest.raises(RuntimeError):
+        await ducks_module.apply_duck_patch(uow, "twitch:busy", {"duck_color": "#3B82F6"})
+    await uow.close()
+    assert sent == []
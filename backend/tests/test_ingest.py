@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from app.core.settings import settings
+from app.models.user import User
+
+
+@pytest.fixture
+def ingest_key(monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_API_KEY", "bridge-key")
+    return {"X-Api-Key": "bridge-key"}
+
+
+@pytest.fixture
+def broadcasts(monkeypatch):
+    from app.services import overlay
+    sent = []
+
+    async def _record(channel, payload):
+        sent.append((channel, json.loads(payload)))
+    monkeypatch.setattr(overlay.rooms, "broadcast", _record)
+    return sent
+
+
+@pytest.mark.anyio
+async def test_ingest_requires_api_key(client, monkeypatch):
+    body = {"channel": "c", "messages": []}
+    monkeypatch.setattr(settings, "INGEST_API_KEY", "")
+    assert (await client.post("/ingest/chat", json=body)).status_code == 503
+    monkeypatch.setattr(settings, "INGEST_API_KEY", "bridge-key")
+    assert (await client.post("/ingest/chat", json=body, headers={"X-Api-Key": "nope"})).status_code == 401
+
+
+@pytest.mark.anyio
+async def test_ingest_resolves_colors_in_one_query(client, db_session, engine, ingest_key, broadcasts):
+    from sqlalchemy import event
+    db_session.add_all([
+        User(id="twitch:a", display="A", duck_color="#FFC93A"),
+        User(id="twitch:b", display="B", duck_color="#3B82F6"),
+    ])
+    await db_session.flush()
+    messages = [{"user_id": uid, "display": uid, "message": f"m{i}"}
+                for i, uid in enumerate(["twitch:a", "twitch:b", "twitch:a", "twitch:ghost"] * 50)]
+
+    statements = []
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        r = await client.post("/ingest/chat", headers=ingest_key,
+                              json={"channel": "channel:quack", "messages": messages})
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _count)
+
+    assert r.json() == {"sent": 200}
+    assert statements == ["SELECT"]
+    assert [e["message"] for _, e in broadcasts] == [m["message"] for m in messages]
+    assert {ch for ch, _ in broadcasts} == {"channel:quack"}
+    colors = {e["user_id"]: e["duck"]["duck_color"] for _, e in broadcasts}
+    assert colors == {"twitch:a": "#FFC93A", "twitch:b": "#3B82F6", "twitch:ghost": "#8A2BE2"}
+
+
+@pytest.mark.anyio
+async def test_colors_cached_and_refreshed_by_duck_update(client, db_session, engine, auth_token, ingest_key, broadcasts):
+    from sqlalchemy import event
+    from app.core.jwt import decode_access_token
+    uid = decode_access_token(auth_token)["sub"]
+    batch = {"channel": "channel:quack",
+             "messages": [{"user_id": uid, "display": "T", "message": "hi"},
+                          {"user_id": "twitch:ghost", "display": "G", "message": "boo"}]}
+    await client.post("/ingest/chat", headers=ingest_key, json=batch)
+    await client.patch("/me/duck", headers={"Authorization": f"Bearer {auth_token}"}, json={"duck_color": "#EF4444"})
+    broadcasts.clear()
+
+    statements = []
+    def _count(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        await client.post("/ingest/chat", headers=ingest_key, json=batch)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _count)
+
+    assert statements == []
+    assert [e["duck"]["duck_color"] for _, e in broadcasts if e["type"] == "chat"] == ["#EF4444", "#8A2BE2"]
+
+
+@pytest.mark.anyio
+async def test_duck_update_during_load_is_not_overwritten():
+    import asyncio
+    from app.core.user_cache import duck_colors
+    from app.services.overlay import duck_update_payload
+
+    loading, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_load(user_ids):
+        loading.set()
+        await release.wait()
+        return {uid: "#8A2BE2" for uid in user_ids}  # read before the update committed
+
+    lookup = asyncio.create_task(duck_colors.get_many(["twitch:racer"], slow_load))
+    await loading.wait()
+    duck_colors.observe(duck_update_payload("twitch:racer", "#FFC93A"))
+    release.set()
+
+    assert await lookup == {"twitch:racer": "#FFC93A"}
+    assert await duck_colors.get_many(["twitch:racer"], slow_load) == {"twitch:racer": "#FFC93A"}
+
+
+@pytest.mark.anyio
+async def test_send_events_refreshes_duck_colors(broadcasts):
+    from app.core.user_cache import duck_colors
+    from app.services.overlay import chat_payload, duck_update_payload, send_events
+
+    async def no_load(user_ids):
+        raise AssertionError("served from the cache")
+
+    await send_events("channel:quack", [chat_payload("A", "hi", "twitch:a"), duck_update_payload("twitch:a", "#3B82F6")])
+    assert await duck_colors.get_many(["twitch:a"], no_load) == {"twitch:a": "#3B82F6"}
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.core.ipc_broker import IpcBroker
+
+
+async def _recv(sub, timeout: float = 1.0):
+    msg = await sub.get_message(timeout)
+    assert msg is not None
+    return msg
+
+
+async def _subscribed(broker: IpcBroker, channel: str, *subs):
+    """Subscribes and waits until the hub routes the channel (SUB and PUB travel on different connections)."""
+    for sub in subs:
+        await sub.subscribe(channel)
+    pending = list(subs)
+    while pending:
+        await broker.publish(channel, "probe")
+        await asyncio.sleep(0.01)
+        pending = [s for s in pending if s._queue.empty()]
+    for sub in subs:
+        while await sub.get_message(0.01) is not None:
+            pass
+
+
+@pytest.fixture
+def sock_path(tmp_path):
+    return str(tmp_path / "broker.sock")
+
+
+async def test_ipc_broker_fans_out_between_brokers(sock_path):
+    a, b = IpcBroker(sock_path), IpcBroker(sock_path)
+    await a.connect()
+    await b.connect()
+    assert a.is_hub and not b.is_hub
+    sub_a, sub_b = await a.open_subscription(), await b.open_subscription()
+    await _subscribed(a, "room", sub_a, sub_b)
+
+    await b.publish("room", {"n": 1})
+    await a.publish_many("room", ["text", b"\x00bin"])
+    for sub in (sub_a, sub_b):
+        assert [await _recv(sub) for _ in range(3)] == [("room", '{"n":1}'), ("room", "text"), ("room", b"\x00bin")]
+
+    await sub_b.unsubscribe("room")
+    await a.publish("room", "only a")
+    assert await _recv(sub_a) == ("room", "only a")
+    assert await sub_b.get_message(0.05) is None
+    for x in (sub_a, sub_b, a, b):
+        await x.close()
+
+
+async def test_ipc_broker_hub_failover(sock_path):
+    a, b = IpcBroker(sock_path), IpcBroker(sock_path)
+    await a.connect()
+    sub_b = await b.open_subscription()
+    await _subscribed(b, "room", sub_b)
+
+    await a.close()  # the hub's worker goes away
+    with pytest.raises(ConnectionError):
+        await _recv(sub_b)
+    await sub_b.close()
+
+    sub_b = await b.open_subscription()  # what RoomListener does after a read failure
+    assert b.is_hub
+    await _subscribed(b, "room", sub_b)
+    await b.publish("room", "still here")
+    assert await _recv(sub_b) == ("room", "still here")
+    await sub_b.close()
+    await b.close()
+
+
+async def test_connect_broker_selects_ipc(sock_path, monkeypatch):
+    from app.core.broker import connect_broker
+    from app.core.settings import settings
+    monkeypatch.setattr(settings, "BROKER_BACKEND", "ipc")
+    monkeypatch.setattr(settings, "IPC_BROKER_PATH", sock_path)
+    broker = await connect_broker()
+    assert isinstance(broker, IpcBroker) and broker.is_hub
+    await broker.close()
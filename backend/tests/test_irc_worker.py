@@ -0,0 +1,94 @@
+import asyncio
+
+from app.workers.irc import ChatLine, IrcWorker, parse_privmsg
+
+
+class FakeBroker:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.published: list[tuple[str, str]] = []
+
+    async def publish_many(self, channel, frames):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.published += [(channel, f) for f in frames]
+
+
+async def _fake_irc_server(lines: list[str], seen: list[str]):
+    """Local IRC server: records what the client sends and streams `lines` after the JOINs."""
+    async def handle(reader, writer):
+        while not (await reader.readline()).startswith(b"JOIN #last"):
+            pass
+        writer.write(b"PING :tmi.twitch.tv\r\n")
+        for line in lines:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+        seen.append((await reader.readline()).decode().strip())
+        await reader.read()  # hold the connection until the client goes away
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def test_parse_privmsg():
+    line = "@badge-info=;color=#FF0000;display-name=Canard;user-id=42 :canard!canard@canard.tmi.twitch.tv PRIVMSG #Quack :coin : coin"
+    assert parse_privmsg(line) == ChatLine("channel:quack", "twitch:42", "Canard", "coin : coin")
+    assert parse_privmsg(":nick!nick@host PRIVMSG #quack :\x01ACTION waves\x01").message == "waves"
+    assert parse_privmsg(":tmi.twitch.tv 001 justinfan :Welcome") is None
+    assert parse_privmsg("PING :tmi.twitch.tv") is None
+    escaped = r"@display-name=Le\sCanard\:\\o/;user-id=7 :lecanard!l@l PRIVMSG #quack :coin"
+    assert parse_privmsg(escaped).display == "Le Canard;\\o/"
+
+
+async def test_worker_streams_chat_from_irc_to_broker():
+    lines = [f"@display-name=U{i % 3};user-id={i % 3} :u!u@u PRIVMSG #last :msg {i}" for i in range(500)]
+    seen: list[str] = []
+    server = await _fake_irc_server(lines, seen)
+    lookups: list[set] = []
+
+    async def colors(user_ids):
+        lookups.append(set(user_ids))
+        return {"twitch:1": "#FFC93A"}
+
+    broker = FakeBroker(delay=0.001)  # slow publisher: the bounded queues must hold
+    worker = IrcWorker(broker, ["last"], host="127.0.0.1", port=server.sockets[0].getsockname()[1],
+                       queue_size=8, batch_size=16, resolve_colors=colors)
+    worker.start()
+    try:
+        for _ in range(500):
+            if len(broker.published) == len(lines):
+                break
+            assert worker.stats()["lines_queued"] <= 8 and worker.stats()["frames_queued"] <= 8
+            await asyncio.sleep(0.01)
+    finally:
+        await worker.stop()
+        server.close()
+
+    from app.core import codec
+    events = [codec.loads(f) for _, f in broker.published]
+    assert [e["message"] for e in events] == [f"msg {i}" for i in range(500)]
+    assert {ch for ch, _ in broker.published} == {"overlay:channel:last"}
+    assert {e["duck"]["duck_color"] for e in events if e["user_id"] == "twitch:1"} == {"#FFC93A"}
+    assert seen == ["PONG :tmi.twitch.tv"]
+    assert len(lookups) < len(lines) and all(len(ids) <= 3 for ids in lookups)
+
+
+async def test_rejected_frames_are_counted_as_dropped():
+    class FailingBroker(FakeBroker):
+        async def publish_many(self, channel, frames):
+            raise ConnectionError("broker down")
+
+    async def colors(user_ids):
+        return {}
+
+    worker = IrcWorker(FailingBroker(), [], resolve_colors=colors)
+    worker.start()
+    try:
+        for i in range(3):
+            await worker._lines.put(ChatLine("channel:quack", "twitch:1", "Canard", f"msg {i}"))
+        for _ in range(100):
+            if worker.stats()["dropped"] == 3:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await worker.stop()
+    assert worker.stats()["dropped"] == 3 and worker.stats()["published"] == 0
+    assert worker.stats()["last_error"] == "ConnectionError: broker down"
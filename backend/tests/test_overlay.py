@@ -0,0 +1,413 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.settings import settings
+from app.services.overlay import RoomListener, Rooms, overlay_channel_name
+
+
+class FakeWebSocket:
+    """Minimal WebSocket stand-in recording what the room writer sends."""
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.sent: list[str] = []
+        self.closed_code: int | None = None
+
+    async def accept(self, subprotocol: str | None = None):
+        pass
+
+    async def send_text(self, data: str):
+        if self.fail:
+            raise RuntimeError("socket is gone")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def send_bytes(self, data: bytes):
+        await self.send_text(data)
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        self.closed_code = code
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_slow_socket_does_not_stall_room():
+    rooms = Rooms()
+    slow, fast = FakeWebSocket(delay=10), FakeWebSocket()
+    await rooms.add(slow, "r")
+    await rooms.add(fast, "r")
+
+    await asyncio.wait_for(rooms.broadcast("r", {"n": 1}), timeout=0.1)
+    await _settle()
+
+    assert [json.loads(f) for f in fast.sent] == [{"n": 1}]
+    await rooms.remove(slow, "r")
+    await rooms.remove(fast, "r")
+
+
+@pytest.mark.asyncio
+async def test_overflow_drops_oldest_then_disconnects(monkeypatch):
+    monkeypatch.setattr(settings, "OVERLAY_SEND_QUEUE_SIZE", 2)
+    monkeypatch.setattr(settings, "OVERLAY_MAX_DROPPED_FRAMES", 3)
+    rooms = Rooms()
+    stuck = FakeWebSocket(delay=10)
+    await rooms.add(stuck, "r")
+    await _settle()  # writer picks frame 0 and blocks on it
+
+    for n in range(4):
+        await rooms.broadcast("r", {"n": n})
+    peer = rooms.rooms["r"][stuck]
+    assert [json.loads(f)["n"] for f in list(peer.queue._queue)] == [2, 3]
+
+    await rooms.broadcast("r", {"n": 4})
+    assert "r" not in rooms.rooms
+    assert stuck.closed_code == 1008
+
+
+@pytest.mark.asyncio
+async def test_failed_send_removes_socket():
+    rooms = Rooms()
+    dead = FakeWebSocket(fail=True)
+    await rooms.add(dead, "r")
+    await rooms.broadcast("r", {"n": 1})
+    await _settle()
+    assert "r" not in rooms.rooms
+
+
+@pytest.mark.asyncio
+async def test_pre_encoded_frames_are_sent_as_is():
+    rooms = Rooms()
+    ws = FakeWebSocket()
+    await rooms.add(ws, "r")
+    await rooms.broadcast("r", '{"type":"chat"}')
+    await rooms.broadcast("r", b'{"type":"chat"}')
+    await _settle()
+    assert ws.sent == ['{"type":"chat"}', b'{"type":"chat"}']
+    await rooms.remove(ws, "r")
+
+
+class FakeSubscription:
+    """In-memory stand-in for a multiplexed broker subscription."""
+    def __init__(self):
+        self.calls: list[tuple[str, ...]] = []
+        self.dropped: list[tuple[str, ...]] = []
+        self.inbox: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, *channels):
+        self.calls.append(channels)
+
+    async def unsubscribe(self, *channels):
+        self.dropped.append(channels)
+
+    async def get_message(self, timeout=1.0):
+        try:
+            return await asyncio.wait_for(self.inbox.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        pass
+
+
+class FakeBroker:
+    def __init__(self):
+        self.subscription = FakeSubscription()
+        self.opened = 0
+
+    async def open_subscription(self):
+        self.opened += 1
+        return self.subscription
+
+
+@pytest.mark.asyncio
+async def test_room_listener_multiplexes_and_routes():
+    rooms = Rooms()
+    listener = RoomListener(rooms, linger=0)
+    broker = FakeBroker()
+    a, b = FakeWebSocket(), FakeWebSocket()
+    await rooms.add(a, "user:a")
+    await rooms.add(b, "user:b")
+
+    await asyncio.gather(*(listener.watch(broker, r) for r in ("user:a", "user:b", "user:c")))
+    await asyncio.sleep(0.05)
+    assert broker.opened == 1
+    assert [sorted(c) for c in broker.subscription.calls] == [
+        sorted(overlay_channel_name(r) for r in ("user:a", "user:b", "user:c"))
+    ]
+
+    await broker.subscription.inbox.put((overlay_channel_name("user:b"), '{"n":1}'))
+    await asyncio.sleep(0.01)
+    assert a.sent == [] and b.sent == ['{"n":1}']
+    await listener.close()
+    await rooms.remove(a, "user:a")
+    await rooms.remove(b, "user:b")
+
+
+@pytest.mark.asyncio
+async def test_unencodable_frames_do_not_stop_the_listener(caplog):
+    rooms = Rooms()
+    listener = RoomListener(rooms, linger=0)
+    broker = FakeBroker()
+    plain, compact = FakeWebSocket(), FakeWebSocket()
+    await rooms.add(plain, "r")
+    await rooms.add(compact, "r", "compact")
+    await listener.watch(broker, "r")
+
+    channel = overlay_channel_name("r")
+    await broker.subscription.inbox.put((channel, "not json"))  # undecodable for compact sockets
+    await broker.subscription.inbox.put((channel, '{"type":"chat","v":1}'))  # missing layout fields
+    await broker.subscription.inbox.put((channel, '{"type":"ping","v":1}'))
+    await asyncio.sleep(0.05)
+
+    assert plain.sent == ["not json", '{"type":"chat","v":1}', '{"type":"ping","v":1}']
+    assert [json.loads(f) for f in compact.sent] == [{"type": "ping", "v": 1}]
+    assert [r.levelname for r in caplog.records if r.name == "app.services.overlay"] == ["ERROR", "ERROR"]
+    await listener.close()
+    await rooms.remove(plain, "r")
+    await rooms.remove(compact, "r")
+
+@pytest.mark.asyncio
+async def test_room_listener_debounces_teardown():
+    listener = RoomListener(Rooms(), linger=0.05)
+    broker = FakeBroker()
+    await listener.watch(broker, "user:a")
+    await listener.watch(broker, "user:a")
+    await asyncio.sleep(0.02)
+
+    listener.release("user:a")
+    listener.release("user:a")
+    await listener.watch(broker, "user:a")  # quick reconnect cancels the teardown
+    listener.release("user:a")
+    assert listener.stats() == {"listeners": 1, "subscribed_channels": 1, "pending_teardowns": 1}
+
+    await asyncio.sleep(0.1)
+    assert listener.stats() == {"listeners": 0, "subscribed_channels": 0, "pending_teardowns": 0}
+    assert broker.subscription.calls == [(overlay_channel_name("user:a"),)]
+    assert broker.subscription.dropped == [(overlay_channel_name("user:a"),)]
+    await listener.close()
+
+
+def test_ws_overlay_releases_db_session(ws_client):
+    from contextlib import ExitStack
+    from app.core.jwt import create_access_token
+    from app.models.user import User
+
+    client, maker, engine = ws_client
+
+    async def seed():
+        async with maker() as session:
+            await session.merge(User(id="twitch:ws", display="WS", duck_color="#8A2BE2"))
+            await session.commit()
+
+    client.portal.call(seed)
+    token = create_access_token({"sub": "twitch:ws"})
+    with ExitStack() as stack:
+        for _ in range(20):
+            stack.enter_context(client.websocket_connect(f"/overlay/ws?token={token}"))
+        assert engine.pool.checkedout() == 0
+
+
+def test_codec_matches_stdlib_json():
+    import json
+    from fastapi.responses import JSONResponse
+    from app.core import codec
+    from app.services.overlay import encode_event, make_chat_event
+
+    event = make_chat_event("Canard", "coin coin 🦆", "twitch:1", "#FFC93A")
+    frame = encode_event(event)
+    assert frame == json.dumps(json.loads(frame), ensure_ascii=False, separators=(",", ":"))
+    assert codec.loads(frame) == json.loads(frame)
+    assert codec.dumps_bytes({"a": [1, "é"]}) == '{"a":[1,"é"]}'.encode()
+    for value in ({1: "un", None: 0}, {"big": 2**70}):  # beyond orjson's defaults, fine for JSONResponse
+        assert codec.FastJSONResponse(value).body == JSONResponse(value).body
+
+
+async def test_broadcast_encodes_once_per_wire_format(monkeypatch):
+    from app.services import wire
+    from app.services.overlay import encode_event, make_chat_event
+
+    calls = []
+    encode = wire.encode
+    monkeypatch.setattr(wire, "encode", lambda payload, fmt: calls.append(fmt) or encode(payload, fmt))
+    room = Rooms()
+    plain, compact = FakeWebSocket(), [FakeWebSocket() for _ in range(3)]
+    await room.add(plain, "r")
+    for ws in compact:
+        await room.add(ws, "r", "compact")
+
+    frame = encode_event(make_chat_event("Canard", "coin", "twitch:1", "#FFC93A"))
+    await room.broadcast("r", frame)
+    await _settle()
+
+    assert plain.sent == [frame]
+    assert calls == ["compact"]
+    assert all(ws.sent[0] is compact[0].sent[0] for ws in compact)
+    assert json.loads(compact[0].sent[0]) == ["chat", "twitch:1", "Canard", "coin", "#FFC93A", 1]
+    for ws in (plain, *compact):
+        await room.remove(ws, "r")
+
+
+def test_wire_negotiation():
+    from app.services import wire
+
+    assert wire.negotiate(None, []) == ("json", False, None)
+    assert wire.negotiate("compact", []) == ("compact", False, None)
+    assert wire.negotiate(None, ["quack.nope", "quack.compact"]) == ("compact", False, "quack.compact")
+    assert wire.negotiate("bogus", ["quack.compact"]).fmt is None
+    assert wire.negotiate(None, [], "deflate") == ("json", True, None)
+    assert wire.negotiate(None, ["quack.compact+deflate"]) == ("compact", True, "quack.compact+deflate")
+    assert wire.to_positional({"type": "custom", "x": 1}) == {"type": "custom", "x": 1}
+
+
+def test_ws_overlay_negotiates_compact_subprotocol(ws_client):
+    from app.core.jwt import create_access_token
+    from app.models.user import User
+    from app.services.overlay import make_duck_update_event, send_event
+
+    client, maker, _ = ws_client
+
+    async def seed():
+        async with maker() as session:
+            await session.merge(User(id="twitch:wire", display="Wire", duck_color="#8A2BE2"))
+            await session.commit()
+
+    client.portal.call(seed)
+    token = create_access_token({"sub": "twitch:wire"})
+    with client.websocket_connect(f"/overlay/ws?token={token}", subprotocols=["quack.compact"]) as ws:
+        assert ws.accepted_subprotocol == "quack.compact"
+        client.portal.call(send_event, "user:twitch:wire", make_duck_update_event("twitch:wire", "#FFC93A"))
+        assert json.loads(ws.receive_bytes()) == ["duck_update", "twitch:wire", "#FFC93A", 1]
+
+
+async def test_deflate_frames_are_compressed_once_per_room(monkeypatch):
+    import zlib
+    from app.services import wire
+    from app.services.overlay import encode_event, make_chat_event
+
+    calls = []
+    deflate = wire.deflate
+    monkeypatch.setattr(wire, "deflate", lambda frame: calls.append(frame) or deflate(frame))
+    room = Rooms()
+    sockets = [FakeWebSocket() for _ in range(4)]
+    for ws in sockets:
+        await room.add(ws, "r", deflate=True)
+
+    frame = encode_event(make_chat_event("Canard", "coin " * 50, "twitch:1"))
+    await room.broadcast("r", frame)
+    await room.broadcast("r", frame)
+    await _settle()
+
+    assert len(calls) == 2
+    first, second = sockets[0].sent
+    assert all(ws.sent[0] is first for ws in sockets)
+    assert len(first) < len(frame)
+    # no context takeover: each message inflates on its own
+    assert zlib.decompress(second, -15).decode() == frame
+    for ws in sockets:
+        await room.remove(ws, "r")
+
+
+@pytest.mark.parametrize("user_id", ["twitch:1", 42])
+def test_fast_path_payloads_match_event_models(user_id):
+    from app.schemas.events import ChatEvent, DuckUpdateEvent
+    from app.services.overlay import chat_payload, duck_update_payload, encode_event, make_chat_event
+
+    chat = chat_payload("Canard", "coin « 🦆 »", user_id, "#FFC93A")
+    assert ChatEvent.model_validate(chat).model_dump() == chat
+    duck = duck_update_payload(user_id, "#FFC93A")
+    assert DuckUpdateEvent.model_validate(duck).model_dump() == duck
+    if isinstance(user_id, str):
+        assert encode_event(chat) == encode_event(make_chat_event("Canard", "coin « 🦆 »", user_id, "#FFC93A"))
+
+
+async def test_heartbeat_reaps_sockets_that_stop_answering():
+    from app.services.overlay import Heartbeat
+
+    room = Rooms()
+    alive, dead, legacy = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    for ws in (alive, dead, legacy):
+        await room.add(ws, "r")
+    room.touch(alive, "r")
+    room.touch(dead, "r")  # answered once, then went half-open
+    hb = Heartbeat(room, interval=0, max_missed=2)
+
+    for _ in range(3):
+        await hb.tick()
+        room.touch(alive, "r")
+    await _settle()
+
+    assert dead.closed_code == 4408 and set(room.rooms["r"]) == {alive, legacy}
+    assert hb.stats() == {"pings": 8, "reaped": 1, "lost": 0, "answering": 1}
+    assert json.loads(legacy.sent[0]) == {"type": "ping", "v": 1}
+    for ws in (alive, legacy):
+        await room.remove(ws, "r")
+
+
+async def test_heartbeat_reaps_silent_dead_sockets_when_enabled():
+    from app.services.overlay import Heartbeat
+
+    room = Rooms()
+    dead, alive = FakeWebSocket(), FakeWebSocket()  # neither ever answered a ping
+    await room.add(dead, "r")
+    hb = Heartbeat(room, interval=0, max_missed=2, reap_silent=True)
+
+    await hb.tick()
+    await room.add(alive, "r")  # joins later: gets its own budget
+    await hb.tick()
+    await hb.tick()
+    await _settle()
+
+    assert dead.closed_code == 4408 and set(room.rooms["r"]) == {alive}
+    assert hb.reaped == 1
+    await room.remove(alive, "r")
+
+
+def test_ws_overlay_counts_lost_connections(ws_client):
+    from app.core.jwt import create_access_token
+    from app.models.user import User
+    from app.services.overlay import heartbeat, rooms
+
+    client, maker, _ = ws_client
+
+    async def seed():
+        async with maker() as session:
+            await session.merge(User(id="twitch:lost", display="Lost", duck_color="#8A2BE2"))
+            await session.commit()
+
+    client.portal.call(seed)
+    lost = heartbeat.lost
+    token = create_access_token({"sub": "twitch:lost"})
+    with client.websocket_connect(f"/overlay/ws?token={token}") as ws:
+        ws.close(code=1006)  # what the server reports when its protocol ping times out
+    client.portal.call(asyncio.sleep, 0.05)
+    assert heartbeat.lost == lost + 1
+    assert "user:twitch:lost" not in rooms.rooms
+
+async def test_send_event_through_in_memory_broker(monkeypatch):
+    from app.core.broker import InMemoryBroker
+    from app.main import app
+    from app.services import overlay
+
+    broker = InMemoryBroker()
+    room = Rooms()
+    listener = RoomListener(room, batch_window=0, linger=0)
+    monkeypatch.setattr(overlay, "room_listener", listener)
+    monkeypatch.setattr(app.state, "broker", broker, raising=False)
+    ws = FakeWebSocket()
+    await room.add(ws, "user:a")
+    await overlay.ensure_room_listener("user:a")  # returns once the subscription is live
+
+    await overlay.send_event("user:a", overlay.duck_update_payload("a", "#FFC93A"))
+    await overlay.send_event("user:b", overlay.duck_update_payload("b", "#FFC93A"))
+    await _settle()
+
+    assert [json.loads(f)["user_id"] for f in ws.sent] == ["a"]
+    await room.remove(ws, "user:a")
+    await listener.close()
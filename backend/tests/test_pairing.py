@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 
 @pytest.mark.anyio
@@ -19,4 +20,160 @@ async def test_pairing_flow(client, auth_token):
         )
     assert r2.status_code == 200
     claimed = r2.json()
-    assert claimed["ok"] is True
\ No newline at end of file
+    assert claimed["ok"] is True
+
+@pytest.mark.anyio
+async def test_parallel_claims_have_one_winner_per_code(session_maker):
+    from app.db.uow import UnitOfWork
+    from app.services.pairing import claim_pairing_code, create_pairing_code
+
+    async with session_maker() as session:
+        uow = UnitOfWork(session=session)
+        codes = [(await create_pairing_code(uow, duck_color="#3B82F6"))["code"] for _ in range(4)]
+
+    gate = asyncio.Semaphore(25)  # bounded in-flight connections; SQLite serializes writers anyway
+
+    async def claim(i: int) -> tuple[str, dict]:
+        code = codes[i % len(codes)]
+        async with gate, session_maker() as session:
+            return code, await claim_pairing_code(UnitOfWork(session=session), code, f"twitch:racer{i}", "default")
+
+    results = await asyncio.gather(*(claim(i) for i in range(200)))
+
+    winners = {code: sum(1 for c, r in results if c == code and r.get("ok")) for code in codes}
+    assert winners == {code: 1 for code in codes}
+    assert all(r == {"error": "Invalid code"} for _, r in results if not r.get("ok"))
+
+
+@pytest.mark.anyio
+async def test_sweeper_deletes_expired_codes_in_batches(session_maker):
+    from contextlib import asynccontextmanager
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import func, select
+    from app.db.uow import UnitOfWork
+    from app.models.pairing import PairingCode
+    from app.services.sweeper import PairingSweeper
+
+    past = datetime.now(timezone.utc) - timedelta(minutes=1)
+    async with session_maker() as session:
+        session.add_all(PairingCode(code=f"OLD{i:03d}", duck_color="#3B82F6", expires_at=past) for i in range(25))
+        session.add(PairingCode(code="FRESH1", duck_color="#3B82F6"))
+        await session.commit()
+
+    @asynccontextmanager
+    async def scope():
+        async with session_maker() as session:
+            yield UnitOfWork(session=session)
+
+    sweeper = PairingSweeper(uow_factory=scope, batch_size=10)
+    assert await sweeper.sweep_once() == 25
+    assert sweeper.stats()["rows_swept"] == 25
+
+    async with session_maker() as session:
+        left = await session.scalar(select(func.count()).select_from(PairingCode).where(PairingCode.expires_at <= datetime.now(timezone.utc)))
+        assert left == 0
+        fresh = await session.get(PairingCode, "FRESH1")
+        assert fresh is not None
+        await session.delete(fresh)  # the database is shared by the whole session
+        await session.commit()
+
+
+@pytest.mark.anyio
+async def test_concurrent_code_creation_survives_collisions(session_maker, monkeypatch):
+    from app.core.settings import settings
+    from app.db.uow import UnitOfWork
+
+    # 3 chars = 32768 codes: a few thousand live codes make collisions frequent enough to exercise retries
+    # (benchmarks/stress_pairing_codes.py runs the same scenario at full volume)
+    monkeypatch.setattr(settings, "PAIRING_CODE_LENGTH", 3)
+    monkeypatch.setattr(settings, "PAIRING_CODE_MAX_ATTEMPTS", 32)
+
+    async def worker() -> list[str]:
+        codes = []
+        async with session_maker() as session:
+            uow = UnitOfWork(session=session)
+            for i in range(200):
+                codes.append((await uow.pairing.create("#3B82F6", "stress")).code)
+                if i % 50 == 49:
+                    await uow.commit()
+        return codes
+
+    batches = await asyncio.gather(*(worker() for _ in range(10)))
+    codes = [c for batch in batches for c in batch]
+    assert len(codes) == len(set(codes)) == 2000
+
+
+def test_pairing_ws_pushes_claim_and_expiry(ws_client):
+    import json
+    from app.db.uow import UnitOfWork
+    from app.services.pairing import claim_pairing_code
+
+    client, maker, _ = ws_client
+
+    async def create(ttl_s: int) -> str:
+        async with maker() as session:
+            rec = await UnitOfWork(session).pairing.create("#3B82F6", "default", ttl_s=ttl_s)
+            await session.commit()
+            return rec.code
+
+    async def claim(code: str) -> dict:
+        async with maker() as session:
+            return await claim_pairing_code(UnitOfWork(session), code, "twitch:guest", "default")
+
+    code = client.portal.call(create, 60)
+    with client.websocket_connect(f"/pairing/ws?code={code}") as ws:
+        assert client.portal.call(claim, code)["ok"] is True
+        event = json.loads(ws.receive_text())
+        assert event["type"] == "pairing_claimed" and event["duck"]["duck_color"] == "#3B82F6"
+        # the claim ends the wait: the socket closes right away, no "pairing_expired" follows
+        assert ws.receive()["type"] == "websocket.close"
+
+    code = client.portal.call(create, 1)
+    with client.websocket_connect(f"/pairing/ws?code={code}") as ws:
+        assert json.loads(ws.receive_text())["type"] == "pairing_expired"
+
+
+@pytest.fixture
+async def redis_pairing():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # EVAL support for the claim script
+    from app.repository.pairing import RedisPairingRepository
+
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    try:
+        yield RedisPairingRepository(client, prefix="test-pairing")
+    finally:
+        await client.flushall()
+        await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_redis_pairing_create_and_get(redis_pairing):
+    rec = await redis_pairing.create("#3B82F6", "chan", ttl_s=120)
+    got = await redis_pairing.get(rec.code)
+    assert (got.code, got.duck_color, got.channel) == (rec.code, "#3B82F6", "chan")
+    assert got.expires_at == rec.expires_at
+    assert 0 < await redis_pairing.client.ttl(f"test-pairing:{rec.code}") <= 120
+    assert await redis_pairing.get("NOPE2345") is None
+
+
+@pytest.mark.anyio
+async def test_redis_pairing_claim_checks_channel_and_consumes_once(redis_pairing):
+    rec = await redis_pairing.create("#3B82F6", "chan")
+    assert await redis_pairing.claim(rec.code, "other") is None
+    assert await redis_pairing.get(rec.code) is not None  # a wrong channel leaves the code alive
+
+    first, second = await asyncio.gather(redis_pairing.claim(rec.code, "chan"), redis_pairing.claim(rec.code, "chan"))
+    assert [c is not None for c in (first, second)].count(True) == 1
+    assert (first or second).duck_color == "#3B82F6"
+    assert await redis_pairing.get(rec.code) is None
+
+
+@pytest.mark.anyio
+async def test_redis_pairing_codes_expire(redis_pairing):
+    rec = await redis_pairing.create("#3B82F6", "chan", ttl_s=60)
+    await redis_pairing.client.pexpire(f"test-pairing:{rec.code}", 1)
+    await asyncio.sleep(0.05)
+    assert await redis_pairing.get(rec.code) is None
+    assert await redis_pairing.claim(rec.code, "chan") is None
+    assert await redis_pairing.delete_expired(100) == 0
@@ -0,0 +1,42 @@
+import pytest
+
+from app.db.uow import UnitOfWork
+
+
+@pytest.mark.anyio
+async def test_uow_opens_session_on_first_repository_access(session_maker):
+    opened = []
+
+    def factory():
+        session = session_maker()
+        opened.append(session)
+        return session
+
+    idle = UnitOfWork(session_factory=factory)
+    await idle.commit()
+    await idle.close()
+    assert opened == [] and not idle.started
+
+    uow = UnitOfWork(session_factory=factory)
+    assert await uow.users.get("twitch:nobody") is None
+    assert uow.pairing.session is uow.users.session
+    await uow.close()
+    assert len(opened) == 1 and not uow.started
+
+
+@pytest.mark.anyio
+async def test_commit_survives_a_failed_invalidation(session_maker, monkeypatch):
+    import app.db.uow as uow_module
+
+    async def broker_down(changed):
+        raise ConnectionError("broker unreachable")
+    monkeypatch.setattr(uow_module, "publish_user_invalidation", broker_down)
+
+    uow = UnitOfWork(session_factory=session_maker)
+    await uow.users.upsert_color("twitch:committed", "#FFC93A")
+    await uow.commit()  # the write is durable: a broker error must not turn it into a failure
+    await uow.close()
+
+    check = UnitOfWork(session_factory=session_maker)
+    assert (await check.users.get("twitch:committed")).duck_color == "#FFC93A"
+    await check.close()